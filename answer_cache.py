@@ -0,0 +1,144 @@
+"""
+🔥 Warm answer cache for the suggested queries
+When a new analysis version is published, answers for the advertised sample
+queries and the sidebar actions are generated once in the background (at batch
+priority) and then served instantly, and identically, until the data changes.
+"""
+
+import re
+import threading
+import time
+
+DEFAULT_WARMUP_CONFIG = {
+    "retry_seconds": 60,  # wait before retrying queries that could not be answered (LLM offline/busy)
+    "start_delay": 2.0,   # let the first page render finish before the pass imports numpy and the panel
+}
+
+
+def normalize_query(text):
+    """Cache key for a question: case, punctuation and spacing are ignored"""
+    return " ".join(re.findall(r"[a-z0-9%]+", str(text).lower()))
+
+
+class AnswerCache:
+    """Answers keyed by (data version, normalised query); a new version drops the old set"""
+
+    def __init__(self, retry_seconds=60, start_delay=0.0):
+        self.retry_seconds = retry_seconds
+        self.start_delay = start_delay
+        self._lock = threading.Lock()
+        self._version = None
+        self._answers = {}
+        self._queries = set()     # keys the warm-up is responsible for
+        self._running = None      # version a background pass is working on
+        self._last_pass = None    # when the last pass for the current version finished
+        self._stats = {
+            "passes": 0,
+            "warmed": 0,
+            "failed": 0,
+            "hits": 0,
+            "misses": 0,
+            "warm_seconds": 0.0,
+        }
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version
+
+    def get(self, version, query):
+        """Cached answer for query under version, or None"""
+        key = normalize_query(query)
+        with self._lock:
+            answer = self._answers.get(key) if version == self._version else None
+            if key in self._queries:
+                self._stats["hits" if answer is not None else "misses"] += 1
+            return answer
+
+    def warm(self, version, jobs):
+        """
+        Start a background pass that fills in the answers still missing for version.
+        jobs: [(query, generate)] where generate() returns the answer text, or None
+        if it cannot be answered reliably right now (it is retried after retry_seconds).
+        Returns True if a pass was started.
+        """
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._answers = {}
+                self._last_pass = None
+            self._queries = {normalize_query(query) for query, _ in jobs}
+            pending = [(query, generate) for query, generate in jobs
+                       if normalize_query(query) not in self._answers]
+            if not pending or self._running == version:
+                return False
+            if self._last_pass is not None and time.monotonic() - self._last_pass < self.retry_seconds:
+                return False
+            self._running = version
+        thread = threading.Thread(target=self._run, args=(version, pending),
+                                  name="answer-warmup", daemon=True)
+        thread.start()
+        return True
+
+    def retry_due(self):
+        """True if some queries are still unanswered and retry_seconds have passed since the last pass"""
+        with self._lock:
+            if self._running is not None or len(self._answers) >= len(self._queries):
+                return False
+            return self._last_pass is None or time.monotonic() - self._last_pass >= self.retry_seconds
+
+    def _run(self, version, jobs):
+        time.sleep(self.start_delay)
+        started = time.monotonic()
+        try:
+            for query, generate in jobs:
+                if self.version != version:
+                    return  # superseded by newer data; that pass will redo the work
+                try:
+                    answer = generate()
+                except Exception:
+                    answer = None
+                with self._lock:
+                    if version != self._version:
+                        return
+                    if answer:
+                        self._answers[normalize_query(query)] = answer
+                        self._stats["warmed"] += 1
+                    else:
+                        self._stats["failed"] += 1
+        finally:
+            with self._lock:
+                self._stats["passes"] += 1
+                self._stats["warm_seconds"] += time.monotonic() - started
+                if self._running == version:
+                    self._running = None
+                    if version == self._version:
+                        self._last_pass = time.monotonic()
+
+    def metrics(self):
+        """Snapshot of cache contents, warm-up progress and hit rate"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "answers": len(self._answers),
+                "queries": len(self._queries),
+                "warming": self._running is not None,
+            })
+        return snapshot
+
+
+# ===== PROCESS-WIDE INSTANCE =====
+# Shared by every session in the server process, like the LLM scheduler.
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache(config=None):
+    """Return the process-wide answer cache, creating it from config on first use"""
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            settings = dict(DEFAULT_WARMUP_CONFIG)
+            settings.update(config or {})
+            _answer_cache = AnswerCache(**settings)
+        return _answer_cache
@@ -0,0 +1,193 @@
+"""
+🧠 Bounded multi-turn conversation memory
+Keeps the last few exchanges verbatim, folds older ones into a compact running
+summary and tracks which industries and metrics are in focus, all under a hard
+token budget so prompt size stays flat as conversations grow.
+"""
+
+import re
+from collections import OrderedDict
+
+from knowledge_index import estimate_tokens
+
+DEFAULT_MEMORY_CONFIG = {
+    "recent_turns": 2,        # exchanges kept verbatim
+    "summary_tokens": 120,    # cap on the rolling summary
+    "turn_tokens": 80,        # cap on each verbatim message
+    "max_entities": 4,        # industries / metrics remembered as "in focus"
+}
+
+# Metric vocabulary -> canonical metric name
+METRIC_TERMS = OrderedDict([
+    ("investability", "investability"),
+    ("invest", "investability"),
+    ("overall", "overall score"),
+    ("resilien", "resilience"),
+    ("covid", "resilience"),
+    ("shock", "resilience"),
+    ("pandemic", "resilience"),
+    ("growth", "growth"),
+    ("growing", "growth"),
+    ("cagr", "growth"),
+    ("forecast", "predictability"),
+    ("predict", "predictability"),
+    ("mape", "predictability"),
+    ("volatil", "volatility"),
+    ("drawdown", "drawdown"),
+    ("recover", "recovery"),
+    ("portfolio", "portfolio"),
+    ("diversif", "portfolio"),
+])
+
+# Follow-ups that lean on earlier turns ("its", "that sector", "how about ...")
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|it's|they|them|their|that|those|this|these|same|how about|what about|and)\b",
+    re.IGNORECASE
+)
+
+
+def clip_to_tokens(text, max_tokens):
+    """Trim text to roughly max_tokens, cutting at a word boundary"""
+    text = re.sub(r"\s+", " ", text).strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    clipped = text[:max_tokens * 4].rsplit(" ", 1)[0]
+    return clipped + " …"
+
+
+def _strip_markdown(text):
+    text = re.sub(r"[*_`#>]+", "", text)
+    return re.sub(r"[^\x00-\x7F]+", " ", text)
+
+
+class ConversationMemory:
+    """Recent turns verbatim + rolling summary + structured focus entities"""
+
+    def __init__(self, recent_turns=2, summary_tokens=120, turn_tokens=80, max_entities=4):
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.turn_tokens = turn_tokens
+        self.max_entities = max_entities
+        self.recent = []          # [(question, answer)] newest last
+        self.summary_lines = []   # one compact line per folded exchange
+        self.industries = OrderedDict()  # most recently mentioned last
+        self.metrics = OrderedDict()
+        self.turns = 0
+
+    # ---------- UPDATES ----------
+    def add_exchange(self, question, answer, known_industries=()):
+        """Record one user/assistant exchange and fold overflow into the summary"""
+        self.turns += 1
+        asked = self._find_industries(question, known_industries)
+        if not asked:
+            # "Which sector is most resilient?" -> the answer's first industry becomes the subject
+            asked = self._find_industries(answer, known_industries)[:1]
+        for name in asked:
+            self._touch(self.industries, name)
+        for metric in self._find_metrics(question):
+            self._touch(self.metrics, metric)
+
+        self.recent.append((question, answer))
+        while len(self.recent) > self.recent_turns:
+            old_question, old_answer = self.recent.pop(0)
+            self._fold(old_question, old_answer, known_industries)
+
+    def _touch(self, entries, key):
+        entries.pop(key, None)
+        entries[key] = self.turns
+        while len(entries) > self.max_entities:
+            entries.popitem(last=False)
+
+    def _fold(self, question, answer, known_industries):
+        topics = self._find_industries(question, known_industries) or self._find_industries(answer, known_industries)[:2]
+        metrics = self._find_metrics(question)
+        line = "Asked: " + clip_to_tokens(_strip_markdown(question), 20)
+        if topics or metrics:
+            line += " [" + ", ".join(topics + metrics) + "]"
+        first_fact = re.split(r"(?<=[.!?])\s|\n", _strip_markdown(answer).strip(), maxsplit=1)[0]
+        if first_fact:
+            line += " Answer: " + clip_to_tokens(first_fact, 25)
+        self.summary_lines.append(line)
+        while self.summary_lines and estimate_tokens(" ".join(self.summary_lines)) > self.summary_tokens:
+            self.summary_lines.pop(0)
+
+    # ---------- EXTRACTION ----------
+    @staticmethod
+    def _find_industries(text, known_industries):
+        found = []
+        lowered = text.lower()
+        # Longest names first so "Computer and electronic products" beats "Computer"
+        for name in sorted(known_industries, key=len, reverse=True):
+            pattern = r"\b" + re.escape(name.lower()) + r"\b"
+            match = re.search(pattern, lowered)
+            if match and not any(name.lower() in other.lower() for _, other in found):
+                found.append((match.start(), name))
+        return [name for _, name in sorted(found)]
+
+    @staticmethod
+    def _find_metrics(text):
+        lowered = text.lower()
+        found = []
+        for term, metric in METRIC_TERMS.items():
+            if term in lowered and metric not in found:
+                found.append(metric)
+        return found
+
+    # ---------- READS ----------
+    def focus_industries(self):
+        return list(reversed(self.industries))
+
+    def focus_metrics(self):
+        return list(reversed(self.metrics))
+
+    def expand_query(self, question, known_industries=()):
+        """Add the industries in focus to a follow-up that does not name one itself"""
+        if self._find_industries(question, known_industries) or not self.industries:
+            return question
+        # Only explicit references ("its", "what about ..."); a short new question stays as asked
+        if FOLLOW_UP_PATTERN.search(question):
+            return question + " " + " ".join(self.focus_industries()[:2])
+        return question
+
+    def render(self, token_budget=300):
+        """Conversation block for the prompt, never longer than token_budget"""
+        if not self.recent and not self.summary_lines:
+            return ""
+        header = "CONVERSATION SO FAR:\n"
+        parts = []
+        if self.industries or self.metrics:
+            focus = []
+            if self.industries:
+                focus.append("industries: " + ", ".join(self.focus_industries()))
+            if self.metrics:
+                focus.append("metrics: " + ", ".join(self.focus_metrics()))
+            parts.append("In focus - " + "; ".join(focus))
+        summary = list(self.summary_lines)
+        recent = [
+            (clip_to_tokens(q, self.turn_tokens), clip_to_tokens(_strip_markdown(a), self.turn_tokens))
+            for q, a in self.recent
+        ]
+
+        def build():
+            lines = list(parts)
+            if summary:
+                lines.append("Earlier: " + " | ".join(summary))
+            for q, a in recent:
+                lines.append(f"User: {q}")
+                lines.append(f"Assistant: {a}")
+            return header + "\n".join(lines) + "\n"
+
+        # Shed the oldest material first until the block fits
+        text = build()
+        while estimate_tokens(text) > token_budget and (summary or len(recent) > 1):
+            if summary:
+                summary.pop(0)
+            else:
+                recent.pop(0)
+            text = build()
+        if estimate_tokens(text) > token_budget:
+            text = text[:token_budget * 4].rsplit(" ", 1)[0] + " …\n"
+        return text
+
+    def clear(self):
+        self.__init__(self.recent_turns, self.summary_tokens, self.turn_tokens, self.max_entities)
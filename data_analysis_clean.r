@@ -9,10 +9,13 @@ options(dplyr.summarise.inform = FALSE)
 
 # ---------- PATHS ----------
 bea_path <- "Business.xlsx"
-years    <- as.character(2012:2023)
 
 # ---------- LOAD & CLEAN (RVA) ----------
 raw1 <- read_excel(bea_path, sheet = "Table 1", col_names = TRUE, skip = 4)
+# Year columns come from the release itself, so a new BEA year needs no code change
+years      <- grep("^[0-9]{4}$", colnames(raw1), value = TRUE)
+first_year <- min(as.numeric(years))
+last_year  <- max(as.numeric(years))
 colnames(raw1)[2] <- "Industry"
 df1 <- raw1[, c("Industry", years)]
 df1$Industry <- as.character(df1$Industry)
@@ -104,9 +107,9 @@ prod_trend <- prod %>%
 metrics_core <- rva_long %>%
   group_by(Industry) %>%
   summarise(
-    v0   = na.omit(Value[Year==2012])[1],
-    v1   = na.omit(Value[Year==2023])[1],
-    CAGR = cagr_fun(na.omit(Value[Year==2012])[1], na.omit(Value[Year==2023])[1], 11),
+    v0   = na.omit(Value[Year==first_year])[1],
+    v1   = na.omit(Value[Year==last_year])[1],
+    CAGR = cagr_fun(na.omit(Value[Year==first_year])[1], na.omit(Value[Year==last_year])[1], last_year - first_year),
     Volatility = vol_fun(Value),
     MaxDD = dd_fun(Value),
     .groups = "drop"
@@ -205,7 +208,7 @@ top5 <- metrics01 %>% slice_max(order_by = Overall01, n = 5) %>% pull(Industry)
 p1 <- rva_long %>% filter(Industry %in% top5) %>%
   ggplot(aes(Year, Value, color = Industry)) +
   geom_line(linewidth = 1) +
-  labs(title = "Top 5 Industries – RVA (2012–2023)", y = "RVA (2017$ millions)", x = NULL)
+  labs(title = paste0("Top 5 Industries – RVA (", first_year, "–", last_year, ")"), y = "RVA (2017$ millions)", x = NULL)
 
 # Save plot to file
 ggsave("top5_industries_plot.png", p1, width = 12, height = 8, dpi = 300)
@@ -281,7 +284,9 @@ shock <- rva_long %>%
     Drop2020 = (RVA2020 - RVA2019)/RVA2019,
     .groups = "drop"
   ) %>% filter(is.finite(Drop2020)) %>%
-  mutate(ShockResilience01 = rescale01(-Drop2020, max_score = 83))  # higher = more resilient
+  # Drop2020 is the signed 2019->2020 change, so the smallest fall (or a gain) scores highest;
+  # event_study.py scores every other shock window the same way
+  mutate(ShockResilience01 = rescale01(Drop2020, max_score = 83))  # higher = more resilient
 
 write_output("=== MOST RESILIENT TO 2020 SHOCK ===")
 shock_table <- shock %>% arrange(desc(ShockResilience01)) %>% head(10) %>%
@@ -392,7 +397,7 @@ p3 <- ggplot(quad, aes(Momentum, Resilience, size = v1, color = Investability))
   ggrepel::geom_text_repel(data = subset(quad, Industry %in% lab_inds),
                            aes(label = Industry), max.overlaps = 100, size = 3) +
   scale_color_viridis_c(name = "Investability\nScore") +
-  scale_size_continuous(name = "RVA 2023\n($M)", labels = scales::comma) +
+  scale_size_continuous(name = paste0("RVA ", last_year, "\n($M)"), labels = scales::comma) +
   geom_vline(xintercept = 0, linetype = 2, alpha = 0.5) +
   geom_hline(yintercept = median(quad$Resilience, na.rm = TRUE), linetype = 2, alpha = 0.5) +
   labs(title = "Investment Opportunity Quadrant",
@@ -410,7 +415,7 @@ ggsave("investability_quadrant_plot.png", p3, width = 14, height = 10, dpi = 300
 write_output("Investability Quadrant plot saved to: investability_quadrant_plot.png")
 
 # ---------- BACKTEST: 2012–18 → 2019–23 (MAPE both ends) ----------
-make_forecasts <- function(y, yrs = 2012:2023) {
+make_forecasts <- function(y, yrs = as.numeric(years)) {
   df <- data.frame(Year = yrs, Value = as.numeric(y))
   df <- df[is.finite(df$Value) & !is.na(df$Value) & df$Value > 0, ]
   if (nrow(df) < 5) return(NULL)
@@ -487,7 +492,7 @@ if (nrow(sel) < 3) {
 pitch_table <- sel %>%
   left_join(
     rva_long %>% group_by(Industry) %>%
-      summarise(RVA2023 = na.omit(Value[Year == 2023])[1], .groups = "drop"),
+      summarise(RVALatest = na.omit(Value[Year == last_year])[1], .groups = "drop"),
     by = "Industry"
   ) %>%
   mutate(
@@ -500,7 +505,7 @@ pitch_table <- sel %>%
       "MaxDD ", fmt_pct(MaxDD), " · ",
       "Recovery ", fmt_years(Recovery), " · ",
       "ProdSlope ", fmt_num(ProdSlope, 3),
-      ifelse(is.finite(RVA2023), paste0(" · RVA'23 $", format(round(RVA2023,0), big.mark=",")), "")
+      ifelse(is.finite(RVALatest), paste0(" · RVA'", substr(last_year, 3, 4), " $", format(round(RVALatest,0), big.mark=",")), "")
     )
   ) %>%
   transmute(
@@ -513,6 +518,17 @@ pitch_table <- sel %>%
 write_output("=== INVESTOR PITCH SHORTLIST ===")
 write_table(kable(pitch_table), "Investor Pitch Shortlist — Top 3 (robust selection)")
 
+# ---------- FULL METRICS TABLE (chatbot retrieval index) ----------
+industry_metrics <- metrics01 %>%
+  select(Industry, Overall01, Invest01, Growth01, Resilience01,
+         CAGR, Volatility, MaxDD, Recovery, ProdSlope, Bucket) %>%
+  left_join(shock %>% select(Industry, Drop2020, ShockResilience01), by = "Industry") %>%
+  left_join(mape, by = "Industry") %>%
+  mutate(FirstYear = first_year, LastYear = last_year) %>%   # CAGR period
+  arrange(desc(Overall01))
+write.csv(industry_metrics, "industry_metrics.csv", row.names = FALSE)
+write_output("Full industry metrics saved to: industry_metrics.csv")
+
 write_output("Analysis completed successfully!")
 write_output(paste("Results saved to:", output_file))
 write_output("Plots saved as PNG files in the current directory")
\ No newline at end of file
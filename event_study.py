@@ -0,0 +1,218 @@
+"""
+⚡ Event-study engine for shock resilience
+Generalises the 2019→2020 shock analysis in data_analysis_clean.r to any shock
+window: drop, trough, time-to-recover and performance relative to the peer median
+for every industry x every candidate shock window, computed in one array pass.
+
+Usage:
+    python event_study.py 2013 2022            # single-year shocks
+    python event_study.py 2020-2021 --top 10   # multi-year shock window
+"""
+
+import argparse
+import threading
+
+import numpy as np
+
+from panel_store import load_panel_matrix, panel_version
+from question_patterns import parse_windows
+
+# Labels for shocks the team looks at most; any other window is labelled by its years
+KNOWN_SHOCKS = {
+    (2013, 2013): "2013 sequestration",
+    (2020, 2020): "2020 pandemic",
+    (2022, 2022): "2022 inflation",
+}
+
+# Multi-year windows computed alongside every single-year shock
+DEFAULT_EXTRA_WINDOWS = [(2020, 2021)]
+
+SHOCK_SCORE_MAX = 83  # same 0-83 scale as ShockResilience01 in the R analysis
+
+
+def window_label(window):
+    start, end = window
+    if window in KNOWN_SHOCKS:
+        return KNOWN_SHOCKS[window]
+    return str(start) if start == end else f"{start}–{end}"
+
+
+def _rescale(x, max_score):
+    """rescale01() from the R script, column-wise; NaNs stay NaN"""
+    lo = np.nanmin(x, axis=0)
+    hi = np.nanmax(x, axis=0)
+    span = hi - lo
+    scaled = max_score * (x - lo) / np.where(span > 0, span, 1.0)
+    return np.where(span > 0, scaled, 50.0)
+
+
+class EventStudy:
+    """Result matrices (industries x windows) for one data version"""
+
+    def __init__(self, version, industries, years, windows, drop, trough, trough_year, recovery):
+        self.version = version
+        self.industries = industries
+        self.years = years
+        self.windows = windows
+        self.drop = drop
+        self.trough = trough
+        self.trough_year = trough_year
+        self.recovery = recovery
+        # Relative-to-peer: how much better/worse than the median industry in the same window
+        with np.errstate(all="ignore"):
+            peer = np.nanmedian(np.where(np.isfinite(drop), drop, np.nan), axis=0)
+            self.peer_median = peer
+            self.relative = drop - peer
+            # Higher = smaller fall (or a gain) through the shock
+            self.score = _rescale(drop, SHOCK_SCORE_MAX)
+
+    def window_index(self, window):
+        return self.windows.index(tuple(window))
+
+    def top(self, window, n=5, most_resilient=True):
+        """Rows for one window, ranked by shock-resilience score"""
+        j = self.window_index(window)
+        score = self.score[:, j]
+        valid = np.flatnonzero(np.isfinite(score))
+        order = valid[np.argsort(-score[valid] if most_resilient else score[valid], kind="stable")]
+        return [self.row(i, j) for i in order[:n]]
+
+    def row(self, i, j):
+        return {
+            "industry": self.industries[i],
+            "drop": float(self.drop[i, j]),
+            "trough": float(self.trough[i, j]),
+            "trough_year": int(self.trough_year[i, j]) if self.trough_year[i, j] > 0 else None,
+            "recovery_years": float(self.recovery[i, j]),
+            "relative_to_peers": float(self.relative[i, j]),
+            "score": float(self.score[i, j]),
+        }
+
+
+def candidate_windows(years, extra_windows=()):
+    """Every single-year shock with a prior baseline year, plus extra multi-year windows"""
+    windows = [(year, year) for year in years[1:]]
+    for start, end in extra_windows:
+        window = (int(start), int(end))
+        if start - 1 in years and end in years and start <= end and window not in windows:
+            windows.append(window)
+    return windows
+
+
+def compute_event_study(version, industries, years, values, windows):
+    """
+    One pass over the industries x windows x years cube. For each window
+    (start, end) the baseline is the year before start, as 2019 is for 2020:
+      drop     worst level inside the window vs baseline (= Drop2020 for 2020)
+      trough   worst level from the window start to the latest year
+      recovery years from the window start until back at baseline (rec_fun):
+               0 if never below, inf if not yet recovered
+    """
+    years_arr = np.asarray(years)
+    column = {year: j for j, year in enumerate(years)}
+    start = np.array([column[s] for s, _ in windows])
+    end = np.array([column[e] for _, e in windows])
+
+    base = values[:, start - 1]                                   # n x W
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = values[:, None, :] / base[:, :, None]            # n x W x T
+    t = np.arange(len(years))
+    in_window = (t >= start[:, None]) & (t <= end[:, None])       # W x T
+    post = t >= start[:, None]                                    # W x T
+    finite = np.isfinite(ratio) & (base[:, :, None] > 0)
+
+    def worst(mask):
+        masked = np.where(mask & finite, ratio, np.inf)
+        idx = masked.argmin(axis=2)
+        level = np.take_along_axis(masked, idx[:, :, None], axis=2)[:, :, 0]
+        found = np.isfinite(level)
+        return np.where(found, level - 1.0, np.nan), np.where(found, years_arr[idx], 0)
+
+    drop, _ = worst(in_window)
+    trough, trough_year = worst(post)
+
+    recovered = post & finite & (ratio >= 1.0)
+    first = recovered.argmax(axis=2)
+    recovery = np.where(recovered.any(axis=2), years_arr[first] - years_arr[start], np.inf)
+    recovery = np.where((post & finite).any(axis=2), recovery, np.nan)
+
+    return EventStudy(version, industries, years, list(windows), drop, trough, trough_year, recovery)
+
+
+# ===== PROCESS-WIDE CACHE =====
+# The panel matrix per data version, and one result matrix per (version, windows);
+# a new ingest or workbook changes the version and evicts both
+_panels = {}
+_studies = {}
+_studies_lock = threading.Lock()
+
+
+def get_event_study(extra_windows=DEFAULT_EXTRA_WINDOWS, table="Table 1"):
+    version = panel_version(table)
+    with _studies_lock:
+        for cache in (_panels, _studies):
+            for old in [k for k in cache if k[0] != version]:
+                del cache[old]
+        if (version, table) not in _panels:
+            _panels[(version, table)] = load_panel_matrix(table)[1:]
+        industries, years, values = _panels[(version, table)]
+        windows = tuple(candidate_windows(years, extra_windows))
+        if (version, windows) not in _studies:
+            _studies[(version, windows)] = compute_event_study(version, industries, years, values, windows)
+        return _studies[(version, windows)]
+
+
+# ===== FORMATTING =====
+def _pct(x):
+    return f"{x:+.1%}" if np.isfinite(x) else "—"
+
+
+def _years(x):
+    if np.isinf(x):
+        return "Not yet"
+    return f"{x:.0f} yrs" if np.isfinite(x) else "—"
+
+
+def format_window(study, window, n=5):
+    """Markdown answer for "most resilient to shock year X" """
+    j = study.window_index(window)
+    start, end = window
+    baseline = start - 1
+    label = window_label(window)
+    span = f"{baseline}→{end}"
+    lines = [f"🛡️ **MOST RESILIENT TO THE {label.upper()} SHOCK ({span}):**\n"]
+    for i, r in enumerate(study.top(window, n), 1):
+        lines.append(
+            f"{i}. **{r['industry']}** - Score: {r['score']:.1f} | Change: {_pct(r['drop'])} | "
+            f"Trough: {_pct(r['trough'])} | Recovery: {_years(r['recovery_years'])} | "
+            f"vs peers: {_pct(r['relative_to_peers'])}"
+        )
+    lines.append("")
+    lines.append("⚠️ **HARDEST HIT:**")
+    for r in study.top(window, 3, most_resilient=False):
+        lines.append(f"• **{r['industry']}** - Change: {_pct(r['drop'])} | Recovery: {_years(r['recovery_years'])}")
+    lines.append("")
+    lines.append(f"📊 Median industry change: {_pct(study.peer_median[j])} vs {baseline}. "
+                 f"Recovery counts years from {start} until real value added is back at the {baseline} level.")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shock-window event study over the BEA panel")
+    parser.add_argument("windows", nargs="*", help="shock years or ranges, e.g. 2013 2022 2020-2021")
+    parser.add_argument("--table", default="Table 1")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    requested = parse_windows(" ".join(args.windows)) or [w for w in KNOWN_SHOCKS]
+    study = get_event_study(DEFAULT_EXTRA_WINDOWS + requested, table=args.table)
+    print(f"{len(study.industries)} industries x {len(study.windows)} shock windows ({study.version})\n")
+    for window in requested:
+        if window not in study.windows:
+            print(f"Skipping {window_label(window)}: needs data for {window[0] - 1}–{window[1]}\n")
+            continue
+        print(format_window(study, window, args.top) + "\n")
+
+
+if __name__ == "__main__":
+    main()
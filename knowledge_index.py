@@ -0,0 +1,295 @@
+"""
+🔎 Offline lexical retrieval over the per-industry knowledge base
+Builds one document per industry from the analysis outputs and ranks them with
+BM25 so each LLM prompt only carries the rows relevant to the question.
+"""
+
+import csv
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+ANALYSIS_RESULTS_FILE = 'analysis_results.txt'
+INDUSTRY_METRICS_FILE = 'industry_metrics.csv'  # written by data_analysis_clean.r
+REGRESSION_FILES = {
+    'gross_output_regression_equations.csv': 'Gross output trend',
+    'price_index_gross_output_regression_equations.csv': 'Price index trend',
+}
+
+STOPWORDS = {
+    'a', 'about', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does',
+    'for', 'from', 'has', 'have', 'how', 'i', 'in', 'is', 'it', 'its', 'me', 'my', 'of',
+    'on', 'or', 'our', 'should', 'show', 'tell', 'that', 'the', 'their', 'there', 'these',
+    'this', 'to', 'us', 'was', 'we', 'what', 'when', 'which', 'who', 'why', 'will', 'with',
+    'would', 'you', 'your'
+}
+
+# Words a question might use for each ranking list; added to the matching documents
+# so generic questions ("which sectors survived covid?") still find the right rows.
+TOP_INVESTMENT_TAGS = "top investment opportunity pick best recommended overall ranking"
+RESILIENT_TAGS = "resilient resilience survived covid pandemic 2020 shock crisis stable"
+PREDICTABLE_TAGS = "predictable forecast reliable low error mape stable outlook"
+VOLATILE_TAGS = "unpredictable volatile risky forecast high error mape"
+GROWTH_TAGS = "growth growing fast expansion trend leader"
+GROWTH_TOP_K = 5  # fastest-growing industries (by CAGR) that get GROWTH_TAGS
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords"""
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    """Rough LLM token count (~4 characters per token)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+def normalize_industry(name):
+    """Key used to match industry names across files (drops BEA footnote digits)"""
+    name = re.sub(r"\d+$", "", str(name).strip())
+    return re.sub(r"\s+", " ", name).lower()
+
+
+def source_fingerprint(paths):
+    """Change marker for the index inputs: (path, mtime, size) of each existing file"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+def _fmt_pct(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value):
+        return None
+    return f"{value * 100:.1f}%"
+
+
+def _fmt_num(value, digits=1):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value):
+        return None
+    return f"{value:.{digits}f}"
+
+
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def cagr_label(row):
+    """'CAGR <first>-<last>' from the panel years the R script used, or plain 'CAGR'"""
+    first, last = _to_float(row.get('FirstYear')), _to_float(row.get('LastYear'))
+    if first is None or last is None:
+        return "CAGR"
+    return f"CAGR {first:.0f}-{last:.0f}"
+
+
+def _fmt_recovery(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isinf(value):
+        return "not yet recovered"
+    if math.isnan(value):
+        return None
+    return f"{value:.0f} yrs"
+
+
+class IndustryDocument:
+    """One retrievable row of industry facts"""
+
+    def __init__(self, industry):
+        self.industry = industry
+        self.facts = []
+        self.tags = []
+        self.rank = None  # position in the overall ranking, used to break ties
+
+    def add_fact(self, label, value):
+        if value is not None and value != '':
+            self.facts.append(f"{label} {value}")
+
+    def text(self):
+        return f"{self.industry}: " + "; ".join(self.facts)
+
+    def search_text(self):
+        # Industry name counted twice so name matches outrank incidental metric words
+        return " ".join([self.industry, self.industry, self.text()] + self.tags)
+
+
+def build_industry_documents(results, metrics_path=INDUSTRY_METRICS_FILE, regression_files=None):
+    """Collect per-industry facts from the metrics table, ranking lists and regressions"""
+    regression_files = REGRESSION_FILES if regression_files is None else regression_files
+    docs = {}
+
+    def doc_for(name):
+        key = normalize_industry(name)
+        if key not in docs:
+            docs[key] = IndustryDocument(re.sub(r"\d+$", "", str(name).strip()))
+        return docs[key]
+
+    growth = []  # (growth rate, document) used to pick the GROWTH_TAGS industries
+
+    # Full metrics table (every industry)
+    if os.path.exists(metrics_path):
+        with open(metrics_path, newline='') as f:
+            for row in csv.DictReader(f):
+                if not row.get('Industry'):
+                    continue
+                doc = doc_for(row['Industry'])
+                doc.add_fact("Overall Score", _fmt_num(row.get('Overall01')))
+                doc.add_fact("Investability", _fmt_num(row.get('Invest01')))
+                doc.add_fact("Growth Score", _fmt_num(row.get('Growth01')))
+                doc.add_fact("Resilience Score", _fmt_num(row.get('Resilience01')))
+                doc.add_fact(cagr_label(row), _fmt_pct(row.get('CAGR')))
+                doc.add_fact("Volatility", _fmt_pct(row.get('Volatility')))
+                doc.add_fact("Max drawdown", _fmt_pct(row.get('MaxDD')))
+                doc.add_fact("Recovery after 2020", _fmt_recovery(row.get('Recovery')))
+                doc.add_fact("2020 change", _fmt_pct(row.get('Drop2020')))
+                doc.add_fact("2020 Resilience Score", _fmt_num(row.get('ShockResilience01')))
+                doc.add_fact("Forecast MAPE", _fmt_pct(row.get('MAPE')))
+                doc.add_fact("Bucket", row.get('Bucket') if row.get('Bucket') not in (None, 'NA') else None)
+                rate = _to_float(row.get('CAGR'))
+                if rate is not None:
+                    growth.append((rate, doc))
+
+    # Ranking lists from analysis_results.txt (also covers a missing metrics table)
+    if isinstance(results, dict):
+        for i, inv in enumerate(results.get('top_investments', []), 1):
+            doc = doc_for(inv['industry'])
+            doc.rank = i if doc.rank is None else min(doc.rank, i)
+            if not doc.facts:
+                doc.add_fact("Overall Score", inv.get('overall_score'))
+                doc.add_fact("Investability", inv.get('investability'))
+                doc.add_fact("Growth Score", inv.get('growth'))
+                doc.add_fact("Resilience Score", inv.get('resilience'))
+            doc.facts.insert(0, f"Overall rank #{i}")
+            doc.tags.append(TOP_INVESTMENT_TAGS)
+            # Without the metrics table, fall back to the shortlist's growth scores
+            rate = _to_float(inv.get('growth'))
+            if rate is not None and not os.path.exists(metrics_path):
+                growth.append((rate, doc))
+        for i, sector in enumerate(results.get('resilient_sectors', []), 1):
+            doc = doc_for(sector['industry'])
+            doc.add_fact(f"2020 resilience rank #{i}, score", sector.get('score'))
+            doc.tags.append(RESILIENT_TAGS)
+        forecasts = results.get('forecast_results', {})
+        for pred in forecasts.get('best_predictable', []):
+            doc = doc_for(pred['industry'])
+            doc.add_fact("Most predictable, MAPE", pred.get('mape'))
+            doc.tags.append(PREDICTABLE_TAGS)
+        for pred in forecasts.get('worst_predictable', []):
+            doc = doc_for(pred['industry'])
+            doc.add_fact("Least predictable, MAPE", pred.get('mape'))
+            doc.tags.append(VOLATILE_TAGS)
+
+    # Fastest growers by CAGR, not the overall ranking
+    tagged = set()
+    for _, doc in sorted(growth, key=lambda item: -item[0]):
+        if len(tagged) >= GROWTH_TOP_K:
+            break
+        if id(doc) not in tagged:
+            tagged.add(id(doc))
+            doc.tags.append(GROWTH_TAGS)
+
+    # Linear trend equations (only attached to industries or added as their own rows)
+    for path, label in regression_files.items():
+        if not os.path.exists(path):
+            continue
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                if row.get('Name') and row.get('Equation'):
+                    doc_for(row['Name']).add_fact(label, row['Equation'])
+
+    return [doc for doc in docs.values() if doc.facts]
+
+
+class KnowledgeIndex:
+    """BM25 ranking over industry documents"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(doc.search_text())) for doc in documents]
+        self.doc_lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if documents else 0.0
+        doc_freq = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def search(self, query, k=5):
+        """Return up to k (score, document) pairs with a positive score, best first"""
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        if not terms:
+            return []
+        scored = []
+        for i, tf in enumerate(self.term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[i] / self.avg_length)
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (
+            -item[0],
+            self.documents[item[1]].rank if self.documents[item[1]].rank is not None else 1e9
+        ))
+        return [(score, self.documents[i]) for score, i in scored[:k]]
+
+    def select(self, query, token_budget=400, max_docs=6):
+        """Most relevant document texts that fit the token budget"""
+        selected = []
+        used = 0
+        for _, doc in self.search(query, k=max_docs):
+            text = doc.text()
+            cost = estimate_tokens(text)
+            if used + cost > token_budget:
+                continue
+            selected.append(text)
+            used += cost
+        return selected
+
+
+# ===== PROCESS-WIDE CACHE =====
+# The index is rebuilt only when one of its input files changes.
+_cache = {'fingerprint': None, 'index': None}
+_cache_lock = threading.Lock()
+
+
+def index_sources():
+    return [ANALYSIS_RESULTS_FILE, INDUSTRY_METRICS_FILE] + list(REGRESSION_FILES)
+
+
+def get_index(load_results):
+    """Return the current index; load_results() supplies parsed analysis_results.txt"""
+    fingerprint = source_fingerprint(index_sources())
+    with _cache_lock:
+        if _cache['index'] is None or _cache['fingerprint'] != fingerprint:
+            _cache['index'] = KnowledgeIndex(build_industry_documents(load_results()))
+            _cache['fingerprint'] = fingerprint
+        return _cache['index']
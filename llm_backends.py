@@ -0,0 +1,331 @@
+"""
+🔌 Pluggable local LLM backends
+One interface over Ollama's native API, OpenAI-compatible chat completions
+(LM Studio, vLLM, llama.cpp's /v1) and llama.cpp's native /completion server,
+each with streaming, pooled HTTP connections and the right token-limit field.
+
+Benchmark every configured backend/model (time to first token, tokens/sec):
+    python llm_backends.py benchmark
+    python llm_backends.py benchmark --targets my_targets.json --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Targets tried by `python llm_backends.py benchmark`; unreachable ones are skipped
+BENCHMARK_TARGETS = [
+    {"api_type": "ollama", "url": "http://localhost:11434/api/generate", "model": "llama3.2:3b"},
+    {"api_type": "ollama", "url": "http://localhost:11434/api/generate", "model": "llama3:latest"},
+    {"api_type": "openai", "url": "http://localhost:1234/v1/chat/completions", "model": "local-model"},
+    {"api_type": "llamacpp", "url": "http://localhost:8080/completion", "model": "default"},
+]
+BENCHMARK_PROMPT = "In three sentences, explain why government-backed space sectors were resilient in 2020."
+
+
+class LLMBackendError(Exception):
+    """The server answered, but with an error instead of a completion"""
+
+
+def _check_error(body):
+    """Raise LLMBackendError for an {"error": ...} body (Ollama, OpenAI-compatible and llama.cpp all use it)"""
+    error = body.get("error") if isinstance(body, dict) else None
+    if error:
+        raise LLMBackendError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+    return body
+
+
+class LLMBackend:
+    """Base class: subclasses build the request and parse responses / stream chunks"""
+
+    api_type = None
+
+    def __init__(self, config, pool_size=16):
+        self.config = config
+        self.url = config["url"]
+        self.model = config["model"]
+        self.timeout = config.get("timeout", 30)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def base_url(self):
+        parts = urlsplit(self.url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def generate(self, prompt, system_prompt="", on_token=None):
+        """Return the full response text; streams (calling on_token per chunk) if on_token is given"""
+        if on_token is None and not self.config.get("stream", False):
+            response = self.session.post(self.url, json=self.payload(prompt, system_prompt, stream=False),
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            return self.parse_response(response.json())
+        chunks = []
+        for chunk in self.stream(prompt, system_prompt):
+            chunks.append(chunk)
+            if on_token is not None:
+                on_token(chunk)
+        return "".join(chunks)
+
+    def stream(self, prompt, system_prompt="", usage=None):
+        """
+        Yield response text chunks as the server produces them. If usage is a dict,
+        usage["completion_tokens"] is set when the server reports its token count.
+        """
+        with self.session.post(self.url, json=self.payload(prompt, system_prompt, stream=True),
+                               timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            done = False
+            for line in response.iter_lines():
+                # After the last chunk, keep reading to the end of the body so the
+                # pooled connection can be reused instead of being torn down
+                if not line or done:
+                    continue
+                chunk, done, tokens = self.parse_stream_line(line.decode("utf-8"))
+                if tokens is not None and usage is not None:
+                    usage["completion_tokens"] = tokens
+                if chunk:
+                    yield chunk
+
+    def health_check(self, timeout=2):
+        """True if the server answers its health endpoint"""
+        try:
+            return self.session.get(self.health_url(), timeout=timeout).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    # Subclass hooks
+    def payload(self, prompt, system_prompt, stream):
+        raise NotImplementedError
+
+    def parse_response(self, body):
+        raise NotImplementedError
+
+    def parse_stream_line(self, line):
+        """(text chunk, done, completion tokens reported by the server or None);
+        raises LLMBackendError for an error line"""
+        raise NotImplementedError
+
+    def health_url(self):
+        return self.base_url
+
+
+class OllamaBackend(LLMBackend):
+    """Ollama native /api/generate (token limit: options.num_predict)"""
+
+    api_type = "ollama"
+
+    def payload(self, prompt, system_prompt, stream):
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "system": system_prompt,
+            "stream": stream,
+            "options": {
+                "temperature": self.config.get("temperature", 0.7),
+                "num_predict": self.config.get("max_tokens", 1000),
+            },
+        }
+
+    def parse_response(self, body):
+        return _check_error(body).get("response", "No response from LLM")
+
+    def parse_stream_line(self, line):
+        body = _check_error(json.loads(line))
+        return body.get("response", ""), body.get("done", False), body.get("eval_count")
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI-compatible /v1/chat/completions (token limit: max_tokens), SSE streaming"""
+
+    api_type = "openai"
+
+    def payload(self, prompt, system_prompt, stream):
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        body = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.config.get("temperature", 0.7),
+            "max_tokens": self.config.get("max_tokens", 1000),
+            "stream": stream,
+        }
+        if stream:
+            body["stream_options"] = {"include_usage": True}  # final chunk carries the token count
+        return body
+
+    def parse_response(self, body):
+        choices = _check_error(body).get("choices") or [{}]
+        return (choices[0].get("message") or {}).get("content") or "No response from LLM"
+
+    def parse_stream_line(self, line):
+        if not line.startswith("data:"):
+            return "", False, None
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return "", True, None
+        body = _check_error(json.loads(data))
+        # Read on past finish_reason: the usage chunk follows it, then [DONE]
+        choices = body.get("choices") or [{}]
+        delta = choices[0].get("delta") or {}
+        return delta.get("content") or "", False, (body.get("usage") or {}).get("completion_tokens")
+
+    def health_url(self):
+        return self.base_url + "/v1/models"
+
+
+class LlamaCppBackend(LLMBackend):
+    """llama.cpp server native /completion (token limit: n_predict), SSE streaming"""
+
+    api_type = "llamacpp"
+
+    def payload(self, prompt, system_prompt, stream):
+        return {
+            "prompt": f"{system_prompt}\n\nUser: {prompt}\nAssistant:" if system_prompt else prompt,
+            "n_predict": self.config.get("max_tokens", 1000),
+            "temperature": self.config.get("temperature", 0.7),
+            "stream": stream,
+            "cache_prompt": True,  # reuse the KV cache for the shared system prompt prefix
+        }
+
+    def parse_response(self, body):
+        return _check_error(body).get("content", "No response from LLM")
+
+    def parse_stream_line(self, line):
+        if not line.startswith("data:"):
+            return "", False, None
+        body = _check_error(json.loads(line[len("data:"):].strip()))
+        return body.get("content", ""), body.get("stop", False), body.get("tokens_predicted")
+
+    def health_url(self):
+        return self.base_url + "/health"
+
+
+BACKENDS = {cls.api_type: cls for cls in (OllamaBackend, OpenAIBackend, LlamaCppBackend)}
+
+
+def make_backend(config):
+    """Build the backend named by config["api_type"] (default: ollama)"""
+    api_type = config.get("api_type", "ollama")
+    if api_type not in BACKENDS:
+        raise ValueError(f"Unknown api_type '{api_type}'. Choose one of: {', '.join(BACKENDS)}")
+    return BACKENDS[api_type](config)
+
+
+# ===== PROCESS-WIDE INSTANCES =====
+# One backend (and so one connection pool) per distinct config for the server process
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(config):
+    key = json.dumps(config, sort_keys=True)
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = make_backend(config)
+        return _backends[key]
+
+
+# ===== BENCHMARK =====
+def benchmark_backend(backend, prompt=BENCHMARK_PROMPT, runs=3):
+    """
+    Median time-to-first-token, total time and tokens/sec over several streamed runs.
+    Tokens are the server's own count (eval_count / usage.completion_tokens /
+    tokens_predicted); streamed chunks are counted only when it reports none.
+    """
+    samples = []
+    reported = True
+    for _ in range(runs):
+        started = time.perf_counter()
+        first = None
+        chunks = 0
+        usage = {}
+        for chunk in backend.stream(prompt, usage=usage):
+            if first is None:
+                first = time.perf_counter()
+            chunks += 1
+        finished = time.perf_counter()
+        if first is None:
+            continue
+        tokens = usage.get("completion_tokens")
+        if tokens is None:
+            tokens, reported = chunks, False
+        gen_time = finished - first
+        samples.append({
+            "ttft": first - started,
+            "total": finished - started,
+            "tokens": tokens,
+            "tokens_per_sec": (tokens - 1) / gen_time if tokens > 1 and gen_time > 0 else 0.0,
+        })
+    if not samples:
+        return None
+    stats = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+    stats["token_count"] = "server" if reported else "chunks"
+    return stats
+
+
+def run_benchmark(targets, runs=3, max_tokens=128, prompt=BENCHMARK_PROMPT):
+    results = []
+    for target in targets:
+        config = dict(target)
+        config.setdefault("max_tokens", max_tokens)
+        config.setdefault("timeout", 120)
+        label = f"{config.get('api_type', 'ollama')} · {config['model']} · {config['url']}"
+        backend = make_backend(config)
+        if not backend.health_check():
+            results.append({"target": label, "status": "unreachable"})
+            continue
+        try:
+            for _ in backend.stream("Say OK."):  # warm-up: load the model into memory
+                pass
+            stats = benchmark_backend(backend, prompt, runs)
+            results.append({"target": label, "status": "ok" if stats else "no output", **(stats or {})})
+        except requests.exceptions.RequestException as e:
+            results.append({"target": label, "status": f"error: {e}"})
+    return results
+
+
+def print_benchmark(results):
+    print(f"{'Backend · model · url':<70} {'TTFT':>8} {'tok/s':>8} {'total':>8} {'tokens':>7} {'count':>7}")
+    ranked = sorted(results, key=lambda r: (r["status"] != "ok", -r.get("tokens_per_sec", 0)))
+    for r in ranked:
+        if r["status"] == "ok":
+            print(f"{r['target'][:70]:<70} {r['ttft']:7.2f}s {r['tokens_per_sec']:8.1f} "
+                  f"{r['total']:7.2f}s {r['tokens']:7.0f} {r['token_count']:>7}")
+        else:
+            print(f"{r['target'][:70]:<70} {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local LLM backend tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("benchmark", help="measure TTFT and tokens/sec for each target")
+    bench.add_argument("--targets", help="JSON file with a list of {api_type, url, model} targets")
+    bench.add_argument("--runs", type=int, default=3)
+    bench.add_argument("--max-tokens", type=int, default=128)
+    bench.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    targets = BENCHMARK_TARGETS
+    if args.targets:
+        with open(args.targets) as f:
+            targets = json.load(f)
+    results = run_benchmark(targets, runs=args.runs, max_tokens=args.max_tokens)
+    print_benchmark(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
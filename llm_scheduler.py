@@ -0,0 +1,219 @@
+"""
+🚦 Process-wide LLM request scheduler
+Sits in front of the local LLM so every Streamlit session shares one bounded,
+fair queue instead of piling requests straight into Ollama.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Priority classes (lower value is served first)
+PRIORITY_INTERACTIVE = 0  # short questions typed into the chat
+PRIORITY_NORMAL = 1       # long interactive prompts
+PRIORITY_BATCH = 2        # background / precompute work
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BATCH: "batch",
+}
+
+# Settings used by the app (get_scheduler() with no overrides)
+DEFAULT_SCHEDULER_CONFIG = {
+    "max_in_flight": 1,        # match the backend's parallel slots (OLLAMA_NUM_PARALLEL)
+    "max_queue": 32,           # waiting requests beyond this are rejected
+    "queue_timeout": 60,       # seconds a request may wait for a slot
+    "short_prompt_chars": 300  # interactive prompts up to this length get top priority
+}
+
+
+class SchedulerRejected(Exception):
+    """Raised when a request cannot be admitted or waited too long for a slot"""
+
+
+class _Ticket:
+    __slots__ = ("session_id", "priority", "enqueued_at", "granted")
+
+    def __init__(self, session_id, priority):
+        self.session_id = session_id
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class LLMScheduler:
+    """Bounded-concurrency scheduler with per-session fair queuing and priorities"""
+
+    def __init__(self, max_in_flight=1, max_queue=32, queue_timeout=60,
+                 short_prompt_chars=300, wait_window=500):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = queue_timeout
+        self.short_prompt_chars = short_prompt_chars
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        # priority -> {session_id: deque[_Ticket]}, plus a round-robin ring of sessions
+        self._queues = {p: {} for p in PRIORITY_NAMES}
+        self._rings = {p: deque() for p in PRIORITY_NAMES}
+        self._queued = 0
+
+        self._waits = deque(maxlen=wait_window)
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "peak_queue_depth": 0,
+        }
+
+    def classify(self, prompt, priority=PRIORITY_INTERACTIVE):
+        """Demote long interactive prompts so short questions stay snappy"""
+        if priority == PRIORITY_INTERACTIVE and len(prompt or "") > self.short_prompt_chars:
+            return PRIORITY_NORMAL
+        return priority
+
+    def run(self, fn, session_id="default", priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Wait for a slot, call fn() and release the slot; returns fn's result"""
+        ticket = self._acquire(session_id, priority, timeout)
+        ok = False
+        try:
+            result = fn()
+            ok = True
+        finally:
+            # Also on BaseException (e.g. Streamlit's rerun/stop raised mid-answer), so the slot is never lost
+            self._release(ticket, ok=ok)
+        return result
+
+    def _acquire(self, session_id, priority, timeout):
+        timeout = self.queue_timeout if timeout is None else timeout
+        ticket = _Ticket(session_id, priority)
+
+        with self._cond:
+            self._stats["submitted"] += 1
+
+            # Fast path: free slot and nobody waiting ahead of us
+            if self._in_flight < self.max_in_flight and self._queued == 0:
+                self._in_flight += 1
+                ticket.granted = True
+                self._waits.append(0.0)
+                return ticket
+
+            if self._queued >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise SchedulerRejected(
+                    f"LLM queue is full ({self._queued} waiting, limit {self.max_queue})"
+                )
+
+            self._enqueue(ticket)
+            # timeout=None waits indefinitely; 0 means give up unless a slot is free now
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    self._stats["timed_out"] += 1
+                    raise SchedulerRejected(
+                        f"Waited {timeout}s for an LLM slot without getting one"
+                    )
+                self._cond.wait(remaining)
+
+            self._waits.append(time.monotonic() - ticket.enqueued_at)
+            return ticket
+
+    def _release(self, ticket, ok=True):
+        with self._cond:
+            self._in_flight -= 1
+            self._stats["completed" if ok else "failed"] += 1
+            self._dispatch()
+
+    def _enqueue(self, ticket):
+        sessions = self._queues[ticket.priority]
+        if ticket.session_id not in sessions:
+            sessions[ticket.session_id] = deque()
+            self._rings[ticket.priority].append(ticket.session_id)
+        sessions[ticket.session_id].append(ticket)
+        self._queued += 1
+        self._stats["peak_queue_depth"] = max(self._stats["peak_queue_depth"], self._queued)
+
+    def _remove(self, ticket):
+        sessions = self._queues[ticket.priority]
+        pending = sessions.get(ticket.session_id)
+        if pending and ticket in pending:
+            pending.remove(ticket)
+            self._queued -= 1
+            if not pending:
+                del sessions[ticket.session_id]
+                self._rings[ticket.priority].remove(ticket.session_id)
+
+    def _dispatch(self):
+        """Hand free slots to waiting tickets: highest priority first, round-robin across sessions"""
+        granted_any = False
+        while self._in_flight < self.max_in_flight and self._queued > 0:
+            for priority in sorted(self._rings):
+                ring = self._rings[priority]
+                if not ring:
+                    continue
+                session_id = ring.popleft()
+                pending = self._queues[priority][session_id]
+                ticket = pending.popleft()
+                if pending:
+                    ring.append(session_id)
+                else:
+                    del self._queues[priority][session_id]
+                self._queued -= 1
+                self._in_flight += 1
+                ticket.granted = True
+                granted_any = True
+                break
+        if granted_any:
+            self._cond.notify_all()
+
+    def metrics(self):
+        """Snapshot of queue depth, in-flight count and wait-time statistics"""
+        with self._cond:
+            waits = sorted(self._waits)
+            by_priority = {
+                PRIORITY_NAMES[p]: sum(len(q) for q in self._queues[p].values())
+                for p in self._queues
+            }
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": self._queued,
+                "max_queue": self.max_queue,
+                "queue_by_priority": by_priority,
+                "waiting_sessions": len({s for p in self._queues for s in self._queues[p]}),
+                "wait_p50": _percentile(waits, 0.50),
+                "wait_p95": _percentile(waits, 0.95),
+                "wait_max": waits[-1] if waits else 0.0,
+            })
+        return snapshot
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+# ===== PROCESS-WIDE INSTANCE =====
+# Streamlit re-executes the app script on every rerun but keeps imported modules,
+# so a module-level singleton is shared by every session in the server process.
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(config=None):
+    """Return the process-wide scheduler, creating it from config on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            settings = dict(DEFAULT_SCHEDULER_CONFIG)
+            settings.update(config or {})
+            _scheduler = LLMScheduler(**settings)
+        return _scheduler
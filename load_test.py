@@ -0,0 +1,698 @@
+"""
+📈 Concurrent-user load test for the Space Economy chatbot
+Drives many simulated Streamlit sessions (chat input + sidebar buttons) through
+space_chatbot.py headlessly against the stub LLM server, then reports turn latency
+percentiles, rerun and first-paint times, throughput, average memory per session and
+analysis_results.txt contention. The profile command times a cold start and plain
+reruns of the app in one session and lists where the time goes.
+
+Usage:
+    python load_test.py --sessions 20 --turns 6 --latency 0.3 --tokens-per-sec 40 --parallel 1
+    python load_test.py --sessions 50 --json load_report.json --fail-p95 10
+    python load_test.py profile --reruns 20 --top 15
+"""
+
+import argparse
+import builtins
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, 'space_chatbot.py')
+RESULTS_FILE = 'analysis_results.txt'
+COMPLETE_MARKER = 'Analysis completed successfully!'
+SEED_FILES = [
+    'Business.xlsx',
+    'industry_metrics.csv',
+    'gross_output_regression_equations.csv',
+    'price_index_gross_output_regression_equations.csv',
+]
+
+SAMPLE_QUESTIONS = [
+    "What are the best space investment opportunities?",
+    "Which sectors survived COVID-19 best?",
+    "Show me growth trends in the space economy",
+    "Tell me about Federal general government",
+    "How predictable is manufacturing?",
+    "Which sectors should I avoid?",
+    "Which sectors were most resilient to the 2013 shock?",
+    "Build me a diversified portfolio with at most 20% per sector",
+]
+SIDEBAR_BUTTONS = ['investments', 'growth', 'resilience', 'portfolio', 'forecast']
+RUN_ANALYSIS_BUTTON = 'fresh_analysis'
+
+SAMPLE_INDUSTRIES = [
+    ("Federal", 78.1, 80.2, 60.1, 70.3),
+    ("Computer and electronic products", 74.0, 71.2, 75.1, 50.0),
+    ("Information", 70.5, 69.0, 66.2, 61.8),
+    ("Manufacturing", 66.3, 64.1, 70.0, 48.7),
+    ("Wholesale trade", 61.9, 60.4, 52.8, 73.5),
+    ("Professional, scientific, and technical services", 58.2, 57.7, 63.4, 45.1),
+]
+
+
+def sample_results_lines():
+    """Analysis output in the same layout data_analysis_clean.r writes"""
+    lines = ["=== TOP 10 BY OVERALL SCORE ===", "",
+             "Top 10 by Overall Score (Higher is Better)", "=" * 42,
+             "|Industry | Overall Score| Investability Score| Growth Score| Resilience Score|",
+             "|:--|--:|--:|--:|--:|"]
+    lines += [f"|{n} | {o}| {i}| {g}| {r}|" for n, o, i, g, r in SAMPLE_INDUSTRIES]
+    lines += ["", "=== MOST RESILIENT TO 2020 SHOCK ===",
+              "|Industry | 2020 Resilience Score|", "|:--|--:|"]
+    lines += [f"|{n} | {r}|" for n, _, _, _, r in sorted(SAMPLE_INDUSTRIES, key=lambda x: -x[4])]
+    lines += ["", "=== FORECAST BACKTEST RESULTS ===",
+              "Forecast Backtest: 5 Lowest MAPE (best = more predictable)", "|Industry |MAPE |", "|:--|:--|"]
+    lines += [f"|{n} |{2.0 + k:.1f}% |" for k, (n, *_rest) in enumerate(SAMPLE_INDUSTRIES[:5])]
+    lines += ["Forecast Backtest: 5 Highest MAPE (worst = harder to predict)", "|Industry |MAPE |", "|:--|:--|"]
+    lines += [f"|{n} |{40.0 + k:.1f}% |" for k, (n, *_rest) in enumerate(SAMPLE_INDUSTRIES[:5])]
+    lines += ["", COMPLETE_MARKER]
+    return lines
+
+
+def write_results(path, delay=0.0):
+    """Rewrite the results file the way the R script does: truncate, then append line by line"""
+    with open(path, 'w'):
+        pass
+    for line in sample_results_lines():
+        with open(path, 'a') as f:
+            f.write(line + "\n")
+        if delay:
+            time.sleep(delay)
+
+
+# ===== INSTRUMENTATION =====
+class ResultsFileMonitor:
+    """Counts reads of analysis_results.txt, overlap with writers and torn reads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writers_active = 0
+        self.reads = 0
+        self.reads_during_write = 0
+        self.torn_reads = 0
+        self.read_time = 0.0
+        self._original_open = builtins.open
+
+    def install(self):
+        monitor = self
+        original = self._original_open
+
+        def tracked_open(file, mode='r', *args, **kwargs):
+            handle = original(file, mode, *args, **kwargs)
+            if isinstance(file, str) and os.path.basename(file) == RESULTS_FILE and 'r' in mode and '+' not in mode:
+                return _TrackedRead(handle, monitor)
+            return handle
+
+        builtins.open = tracked_open
+
+    def uninstall(self):
+        builtins.open = self._original_open
+
+    def writer(self):
+        monitor = self
+
+        class _Writer:
+            def __enter__(self):
+                with monitor.lock:
+                    monitor.writers_active += 1
+
+            def __exit__(self, *exc):
+                with monitor.lock:
+                    monitor.writers_active -= 1
+
+        return _Writer()
+
+    def record_read(self, content, elapsed, during_write):
+        with self.lock:
+            self.reads += 1
+            self.read_time += elapsed
+            if during_write:
+                self.reads_during_write += 1
+            if COMPLETE_MARKER not in content:
+                self.torn_reads += 1
+
+    def report(self):
+        return {
+            'reads': self.reads,
+            'reads_during_write': self.reads_during_write,
+            'torn_reads': self.torn_reads,
+            'mean_read_ms': 1000 * self.read_time / self.reads if self.reads else 0.0,
+        }
+
+
+class _TrackedRead:
+    def __init__(self, handle, monitor):
+        self._handle = handle
+        self._monitor = monitor
+        self._started = time.perf_counter()
+        self._during_write = monitor.writers_active > 0
+
+    def read(self, *args):
+        content = self._handle.read(*args)
+        self._monitor.record_read(content, time.perf_counter() - self._started, self._during_write)
+        return content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._handle.close()
+
+    def __getattr__(self, name):
+        return getattr(self._handle, name)
+
+
+class MemorySampler:
+    """Samples process RSS in the background to find the peak"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.baseline = rss_mb()
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_mb())
+            self._stop.wait(self.interval)
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def share_test_runtime():
+    """
+    AppTest installs a fresh global Runtime for each run and clears it afterwards,
+    which breaks sessions running concurrently in threads. Keep the most recent
+    runtime visible so overlapping runs never see an empty slot.
+    """
+    from streamlit.runtime import Runtime
+
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+            return cls._instance
+        if 'runtime' in last:
+            return last['runtime']
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or 'runtime' in last)
+
+    # AppTest also builds a new script cache per run; a real server compiles the
+    # script once. Share one compiled copy (parsing concurrently is not thread-safe).
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    compile_lock = threading.Lock()
+    compiled = {}
+    original_get_bytecode = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in compiled:
+                compiled[script_path] = original_get_bytecode(self, script_path)
+            return compiled[script_path]
+
+    ScriptCache.get_bytecode = get_bytecode
+
+
+_runs = threading.local()
+
+
+def track_script_runs():
+    """
+    Record, for every script run, the time until its first element delta leaves the
+    script thread (what a browser could start painting) and the bytes of element
+    deltas sent. AppTest runs the script synchronously on the calling thread, so the
+    stats are kept per thread.
+    """
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    original_run = LocalScriptRunner.run
+
+    def run(self, *args, **kwargs):
+        started = time.perf_counter()
+        stats = {'first_paint': None, 'delta_bytes': 0}
+
+        def on_event(sender, event, **data):
+            if event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG and data['forward_msg'].HasField('delta'):
+                if stats['first_paint'] is None:
+                    stats['first_paint'] = time.perf_counter() - started
+                stats['delta_bytes'] += data['forward_msg'].ByteSize()
+
+        self.on_event.connect(on_event, weak=False)
+        _runs.stats = stats
+        return original_run(self, *args, **kwargs)
+
+    LocalScriptRunner.run = run
+
+
+def last_run_stats():
+    return getattr(_runs, 'stats', {'first_paint': None, 'delta_bytes': 0})
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+# ===== SIMULATED SESSIONS =====
+class SessionResult:
+    def __init__(self):
+        self.load_time = None
+        self.load_paint = None
+        self.turns = []  # (kind, seconds, first paint seconds)
+        self.errors = []
+
+
+def run_session(index, args, monitor, rng_seed, analysis_command):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(rng_seed)
+    result = SessionResult()
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+        started = time.perf_counter()
+        at.run()
+        result.load_time = time.perf_counter() - started
+        result.load_paint = last_run_stats()['first_paint']
+        at.session_state['bot'].analysis_tools['run_full_analysis']['command'] = analysis_command
+
+        for _ in range(args.turns):
+            roll = rng.random()
+            started = time.perf_counter()
+            if roll < args.run_analysis_share:
+                kind = 'run_analysis'
+                with monitor.writer():
+                    at.button(key=RUN_ANALYSIS_BUTTON).click().run()
+            elif roll < args.run_analysis_share + args.button_share:
+                kind = 'button'
+                at.button(key=rng.choice(SIDEBAR_BUTTONS)).click().run()
+            elif roll < args.run_analysis_share + args.button_share + args.rerun_share:
+                # A rerun with no widget change: the floor every interaction pays
+                kind = 'rerun'
+                at.run()
+            else:
+                kind = 'chat'
+                at.chat_input[0].set_value(rng.choice(SAMPLE_QUESTIONS)).run()
+            result.turns.append((kind, time.perf_counter() - started, last_run_stats()['first_paint']))
+            if at.exception:
+                result.errors.append(str(at.exception[0].message))
+            if args.think:
+                time.sleep(rng.uniform(0, args.think))
+    except Exception:
+        result.errors.append(traceback.format_exc(limit=3))
+    return result
+
+
+def start_environment(args):
+    """Seeded temp workdir + stub LLM server, with the app's imports and caches ready to profile"""
+    from stub_llm_server import start_stub_server
+
+    workdir = tempfile.mkdtemp(prefix='space_load_')
+    for name in SEED_FILES:
+        if os.path.exists(os.path.join(REPO_DIR, name)):
+            shutil.copy(os.path.join(REPO_DIR, name), workdir)
+    write_results(os.path.join(workdir, RESULTS_FILE))
+    # Same server options as `streamlit run` from the repo (static serving, no magic)
+    shutil.copytree(os.path.join(REPO_DIR, '.streamlit'), os.path.join(workdir, '.streamlit'))
+
+    server = start_stub_server(latency=args.latency, tokens_per_sec=args.tokens_per_sec,
+                               tokens=args.tokens, parallel=args.parallel)
+    os.environ['LOCAL_LLM_URL'] = server.url
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(workdir)
+
+    import streamlit.testing.v1  # noqa: F401  (import cost excluded from the baseline)
+    share_test_runtime()
+    track_script_runs()
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    return workdir, server
+
+
+def stop_environment(workdir, server, previous_cwd):
+    os.chdir(previous_cwd)
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def wait_for_warm_up(limit):
+    """Wait (up to limit seconds) for the suggested-answer warm-up pass; returns its metrics"""
+    from answer_cache import get_answer_cache
+
+    deadline = time.monotonic() + limit
+    warm = get_answer_cache().metrics()
+    while time.monotonic() < deadline and not (warm['queries'] and not warm['warming']):
+        time.sleep(0.1)
+        warm = get_answer_cache().metrics()
+    return warm
+
+
+def wait_for_warm_answers(limit, timeout):
+    """Load the page once (publishing the seeded analysis) and wait for the warm-up pass"""
+    from streamlit.testing.v1 import AppTest
+
+    AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    wait_for_warm_up(limit)
+
+
+def run_load_test(args):
+    analysis_command = f"{sys.executable} {os.path.abspath(__file__)} write-results --delay {args.write_delay}"
+    previous_cwd = os.getcwd()
+    monitor = ResultsFileMonitor()
+    monitor.install()
+    workdir, server = start_environment(args)
+    if args.warm_first:
+        wait_for_warm_answers(args.warm_first, args.timeout)
+    sampler = MemorySampler()
+    sampler.start()
+
+    results = [None] * args.sessions
+
+    def worker(i):
+        results[i] = run_session(i, args, monitor, args.seed + i, analysis_command)
+
+    threads = []
+    wall_start = time.perf_counter()
+    try:
+        for i in range(args.sessions):
+            thread = threading.Thread(target=worker, args=(i,), daemon=True)
+            thread.start()
+            threads.append(thread)
+            if args.ramp:
+                time.sleep(args.ramp / args.sessions)
+        for thread in threads:
+            thread.join()
+    finally:
+        wall = time.perf_counter() - wall_start
+        sampler.stop()
+        monitor.uninstall()
+        stop_environment(workdir, server, previous_cwd)
+
+    return build_report(args, results, wall, sampler, monitor, server)
+
+
+def build_report(args, results, wall, sampler, monitor, server):
+    turns = [t for r in results for t in r.turns]
+    latencies = [seconds for _, seconds, _ in turns]
+    by_kind = {}
+    for kind, seconds, _ in turns:
+        by_kind.setdefault(kind, []).append(seconds)
+    loads = [r.load_time for r in results if r.load_time is not None]
+    load_paints = [r.load_paint for r in results if r.load_paint is not None]
+    turn_paints = [paint for _, _, paint in turns if paint is not None]
+    errors = [e for r in results for e in r.errors]
+
+    report = {
+        'config': {
+            'sessions': args.sessions, 'turns': args.turns, 'latency': args.latency,
+            'tokens_per_sec': args.tokens_per_sec, 'tokens': args.tokens, 'parallel': args.parallel,
+        },
+        'wall_seconds': wall,
+        'turns': len(turns),
+        'throughput_turns_per_sec': len(turns) / wall if wall else 0.0,
+        'turn_latency': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+        },
+        'turn_latency_by_kind': {
+            kind: {'count': len(v), 'p50': percentile(v, 0.50), 'p95': percentile(v, 0.95)}
+            for kind, v in sorted(by_kind.items())
+        },
+        'page_load': {'p50': percentile(loads, 0.50), 'p95': percentile(loads, 0.95)},
+        'first_paint': {
+            'page_load': {'p50': percentile(load_paints, 0.50), 'p95': percentile(load_paints, 0.95)},
+            'turn': {'p50': percentile(turn_paints, 0.50), 'p95': percentile(turn_paints, 0.95)},
+        },
+        'memory': {
+            'baseline_rss_mb': sampler.baseline,
+            'peak_rss_mb': sampler.peak,
+            # growth over baseline spread evenly across sessions, not a per-session peak
+            'avg_mb_per_session': (sampler.peak - sampler.baseline) / max(1, args.sessions),
+        },
+        'analysis_results_file': monitor.report(),
+        'llm': dict(server.stats),
+        'errors': len(errors),
+        'error_samples': errors[:3],
+    }
+    try:
+        from llm_scheduler import get_scheduler
+        scheduler = get_scheduler().metrics()
+        report['scheduler'] = {k: scheduler[k] for k in
+                               ('peak_queue_depth', 'rejected', 'timed_out', 'wait_p50', 'wait_p95', 'wait_max')}
+    except Exception:
+        pass
+    try:
+        from answer_cache import get_answer_cache
+        warm = get_answer_cache().metrics()
+        report['answer_cache'] = {k: warm[k] for k in
+                                  ('answers', 'queries', 'passes', 'warmed', 'failed', 'hits', 'misses')}
+    except Exception:
+        pass
+    return report
+
+
+def print_report(report):
+    cfg = report['config']
+    print(f"\n🚀 Load test: {cfg['sessions']} sessions × {cfg['turns']} turns "
+          f"(stub LLM: {cfg['latency']}s TTFT, {cfg['tokens_per_sec']} tok/s, {cfg['parallel']} slot(s))")
+    print(f"Wall time:        {report['wall_seconds']:.1f}s")
+    print(f"Throughput:       {report['throughput_turns_per_sec']:.2f} turns/s ({report['turns']} turns)")
+    lat = report['turn_latency']
+    print(f"Turn latency:     p50 {lat['p50']:.2f}s · p95 {lat['p95']:.2f}s · p99 {lat['p99']:.2f}s")
+    for kind, stats in report['turn_latency_by_kind'].items():
+        print(f"  {kind:<14}  n={stats['count']:<4} p50 {stats['p50']:.2f}s · p95 {stats['p95']:.2f}s")
+    load = report['page_load']
+    print(f"Page load:        p50 {load['p50']:.2f}s · p95 {load['p95']:.2f}s")
+    paint = report['first_paint']
+    print(f"First paint:      page load p50 {1000 * paint['page_load']['p50']:.0f} ms · "
+          f"p95 {1000 * paint['page_load']['p95']:.0f} ms · "
+          f"turns p50 {1000 * paint['turn']['p50']:.0f} ms · p95 {1000 * paint['turn']['p95']:.0f} ms")
+    mem = report['memory']
+    print(f"Memory:           peak {mem['peak_rss_mb']:.0f} MB (baseline {mem['baseline_rss_mb']:.0f} MB, "
+          f"avg ~{mem['avg_mb_per_session']:.1f} MB/session)")
+    res = report['analysis_results_file']
+    print(f"{RESULTS_FILE}: {res['reads']} reads · {res['reads_during_write']} during a rewrite · "
+          f"{res['torn_reads']} torn · {res['mean_read_ms']:.2f} ms/read")
+    if 'scheduler' in report:
+        sch = report['scheduler']
+        print(f"LLM queue:        peak depth {sch['peak_queue_depth']} · wait p95 {sch['wait_p95']:.2f}s · "
+              f"{sch['rejected']} rejected · {sch['timed_out']} timed out")
+    if 'answer_cache' in report:
+        warm = report['answer_cache']
+        print(f"Warm answers:     {warm['answers']}/{warm['queries']} ready · {warm['passes']} pass(es) · "
+              f"{warm['hits']} hits · {warm['misses']} misses · {warm['failed']} not cacheable")
+    print(f"Errors:           {report['errors']}")
+    for sample in report['error_samples']:
+        print(f"  {sample.strip().splitlines()[-1]}")
+
+
+# ===== STARTUP / RERUN PROFILE =====
+def profile_script_threads(active):
+    """Run active['profiler'] (if set) inside the script thread, where the app code executes"""
+    from streamlit.runtime.scriptrunner import ScriptRunner
+
+    original = ScriptRunner._run_script_thread
+
+    def run_script_thread(self):
+        profiler = active.get('profiler')
+        if profiler is None:
+            return original(self)
+        profiler.enable()
+        try:
+            return original(self)
+        finally:
+            profiler.disable()
+
+    ScriptRunner._run_script_thread = run_script_thread
+
+
+def top_app_functions(profiler, n):
+    """Cumulative time of the repo's own functions and module bodies, slowest first"""
+    rows = []
+    for (path, line, name), (_, _, _, cumulative, _) in pstats.Stats(profiler).stats.items():
+        if os.path.abspath(path).startswith(REPO_DIR + os.sep):
+            rows.append((cumulative, f"{os.path.basename(path)}:{line}({name})"))
+    rows.sort(reverse=True)
+    return [{'function': label, 'seconds': seconds} for seconds, label in rows[:n]]
+
+
+def run_profile(args):
+    """One session: cold start, plain reruns and one click per sidebar button"""
+    previous_cwd = os.getcwd()
+    workdir, server = start_environment(args)
+    from streamlit.testing.v1 import AppTest
+
+    active = {}
+    profile_script_threads(active)
+    loaded = {name.split('.')[0] for name in sys.modules}
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+        active['profiler'] = cold = cProfile.Profile()
+        started = time.perf_counter()
+        at.run()
+        cold_seconds = time.perf_counter() - started
+        cold_stats = last_run_stats()
+        imported = sorted(name for name in {name.split('.')[0] for name in sys.modules} - loaded
+                          if not name.startswith('_') and name not in sys.stdlib_module_names)
+
+        # The first page load publishes the analysis; let the background warm-up finish
+        # so it does not compete with the reruns being measured
+        started = time.perf_counter()
+        warm_up = wait_for_warm_up(args.timeout)
+        warm_seconds = time.perf_counter() - started
+
+        active['profiler'] = warm = cProfile.Profile()
+        reruns, paints, delta_bytes = [], [], []
+        for _ in range(args.reruns):
+            started = time.perf_counter()
+            at.run()
+            reruns.append(time.perf_counter() - started)
+            paints.append(last_run_stats()['first_paint'] or 0.0)
+            delta_bytes.append(last_run_stats()['delta_bytes'])
+        active.clear()
+
+        clicks = {}
+        for key in SIDEBAR_BUTTONS:
+            started = time.perf_counter()
+            at.button(key=key).click().run()
+            clicks[key] = time.perf_counter() - started
+        errors = [str(e.message) for e in at.exception]
+    finally:
+        active.clear()
+        stop_environment(workdir, server, previous_cwd)
+
+    return {
+        'cold_start': {
+            'seconds': cold_seconds,
+            'first_paint': cold_stats['first_paint'],
+            'delta_bytes': cold_stats['delta_bytes'],
+            'imported_packages': imported,
+            'top_functions': top_app_functions(cold, args.top),
+        },
+        'rerun': {
+            'runs': len(reruns),
+            'p50': percentile(reruns, 0.50),
+            'p95': percentile(reruns, 0.95),
+            'first_paint_p50': percentile(paints, 0.50),
+            'delta_bytes': percentile(delta_bytes, 0.50),
+            'top_functions': top_app_functions(warm, args.top),
+        },
+        'warm_up': {'seconds': warm_seconds, 'answers': warm_up['answers'], 'queries': warm_up['queries']},
+        'button_click': clicks,
+        'errors': errors,
+    }
+
+
+def print_profile(report):
+    cold, rerun = report['cold_start'], report['rerun']
+    print(f"\n🧭 App profile: cold start + {rerun['runs']} reruns + one click per sidebar button")
+    print(f"Cold start:       {cold['seconds']:.2f}s · first paint {1000 * (cold['first_paint'] or 0):.0f} ms · "
+          f"{cold['delta_bytes'] / 1024:.1f} KB of element deltas")
+    print(f"  imported:       {', '.join(cold['imported_packages']) or '-'}")
+    print(f"Rerun:            p50 {1000 * rerun['p50']:.0f} ms · p95 {1000 * rerun['p95']:.0f} ms · "
+          f"first paint p50 {1000 * rerun['first_paint_p50']:.1f} ms · {rerun['delta_bytes'] / 1024:.1f} KB of deltas")
+    warm = report['warm_up']
+    print(f"Warm-up:          {warm['answers']}/{warm['queries']} suggested answers in {warm['seconds']:.1f}s "
+          f"(background, after the first page load)")
+    print("Button click:     " + " · ".join(f"{key} {1000 * seconds:.0f} ms"
+                                          for key, seconds in report['button_click'].items()))
+    for title, rows in (("cold start", cold['top_functions']), ("reruns, total", rerun['top_functions'])):
+        print(f"\nWhere the time goes ({title}, cumulative):")
+        for row in rows:
+            print(f"  {row['seconds']:8.3f}s  {row['function']}")
+    if report['errors']:
+        print(f"\nErrors: {report['errors'][:3]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-user load test for space_chatbot.py")
+    sub = parser.add_subparsers(dest='command')
+
+    writer = sub.add_parser('write-results', help='(internal) stand-in for the R analysis run')
+    writer.add_argument('--delay', type=float, default=0.0)
+    profile = sub.add_parser('profile', help='profile cold start and reruns of a single session')
+    profile.add_argument('--reruns', type=int, default=20)
+    profile.add_argument('--top', type=int, default=12, help='functions to list per phase')
+
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=6, help='actions per session after page load')
+    parser.add_argument('--button-share', type=float, default=0.3, help='share of turns that click a sidebar button')
+    parser.add_argument('--run-analysis-share', type=float, default=0.05, help='share of turns that click Run Analysis')
+    parser.add_argument('--rerun-share', type=float, default=0.1, help='share of turns that rerun with no widget change')
+    parser.add_argument('--think', type=float, default=0.5, help='max think time between turns (s)')
+    parser.add_argument('--ramp', type=float, default=2.0, help='seconds to start all sessions')
+    parser.add_argument('--latency', type=float, default=0.3, help='stub LLM time to first token (s)')
+    parser.add_argument('--tokens-per-sec', type=float, default=40.0)
+    parser.add_argument('--tokens', type=int, default=120)
+    parser.add_argument('--parallel', type=int, default=1, help='stub LLM parallel slots')
+    parser.add_argument('--write-delay', type=float, default=0.01, help='per-line delay of the fake analysis writer')
+    parser.add_argument('--timeout', type=float, default=120, help='per-run timeout for a simulated session')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--warm-first', type=float, default=0,
+                        help='wait up to this long (s) for the suggested-answer warm-up before starting')
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--fail-p95', type=float, help='exit non-zero if p95 turn latency exceeds this (s)')
+    args = parser.parse_args()
+
+    if args.command == 'write-results':
+        write_results(RESULTS_FILE, delay=args.delay)
+        return
+    if args.command == 'profile':
+        report = run_profile(args)
+        print_profile(report)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+        return
+
+    report = run_load_test(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.fail_p95 is not None and report['turn_latency']['p95'] > args.fail_p95:
+        print(f"\n❌ p95 turn latency {report['turn_latency']['p95']:.2f}s exceeds {args.fail_p95}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""
+🗄️ Append-only panel store for BEA space economy tables
+Keeps every (table, industry, year, vintage) observation ever ingested, so a new
+BEA year or a revised release is an append, and keeps per-series metric
+accumulators (CAGR, drawdown, volatility, regression sums) that are updated
+incrementally instead of recomputed from the whole workbook.
+
+Usage:
+    python panel_store.py ingest Business.xlsx [--vintage 2025-03-31]
+    python panel_store.py metrics [--table "Table 1"] [--as-of 2025-03-31]
+    python panel_store.py vintages
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+STORE_PATH = 'panel_store.db'
+DEFAULT_TABLES = ('Table 1', 'Table 7')  # Real value added, employment (as in data_analysis_clean.r)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    table_name TEXT NOT NULL,
+    industry   TEXT NOT NULL,
+    year       INTEGER NOT NULL,
+    vintage    TEXT NOT NULL,
+    value      REAL,
+    PRIMARY KEY (table_name, industry, year, vintage)
+);
+CREATE TABLE IF NOT EXISTS vintages (
+    vintage     TEXT PRIMARY KEY,
+    source      TEXT,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS series_state (
+    table_name TEXT NOT NULL,
+    industry   TEXT NOT NULL,
+    vintage    TEXT NOT NULL,
+    state      TEXT NOT NULL,
+    PRIMARY KEY (table_name, industry, vintage)
+);
+"""
+
+
+class SeriesState:
+    """Running accumulators for one industry series, updated one year at a time"""
+
+    FIELDS = (
+        'first_year', 'first_value', 'last_year', 'last_value', 'n',
+        'running_max', 'max_drawdown',
+        'n_ret', 'mean_ret', 'm2_ret',
+        'sx', 'sy', 'sxx', 'sxy', 'syy'
+    )
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+        for field in ('n', 'n_ret', 'mean_ret', 'm2_ret', 'sx', 'sy', 'sxx', 'sxy', 'syy'):
+            if getattr(self, field) is None:
+                setattr(self, field, 0)
+
+    @classmethod
+    def from_values(cls, values_by_year):
+        state = cls()
+        for year in sorted(values_by_year):
+            state.update(year, values_by_year[year])
+        return state
+
+    def update(self, year, value):
+        """Fold in the next (later) year's value"""
+        if value is None or not math.isfinite(value):
+            return
+        if self.last_year is not None and year <= self.last_year:
+            raise ValueError(f"Year {year} is not after {self.last_year}; rebuild the series instead")
+
+        if self.n == 0:
+            self.first_year, self.first_value = year, value
+            self.running_max = value
+            self.max_drawdown = 0.0
+        else:
+            # YoY return (Welford running mean/variance), skipped when undefined
+            if self.last_value:
+                ret = (value - self.last_value) / self.last_value
+                if math.isfinite(ret):
+                    self.n_ret += 1
+                    delta = ret - self.mean_ret
+                    self.mean_ret += delta / self.n_ret
+                    self.m2_ret += delta * (ret - self.mean_ret)
+            self.running_max = max(self.running_max, value)
+            if self.running_max:
+                self.max_drawdown = min(self.max_drawdown, (value - self.running_max) / self.running_max)
+
+        self.last_year, self.last_value = year, value
+        self.n += 1
+        # Linear trend sufficient statistics (value ~ year)
+        self.sx += year
+        self.sy += value
+        self.sxx += year * year
+        self.sxy += year * value
+        self.syy += value * value
+
+    def metrics(self):
+        """Derived metrics, following the definitions in data_analysis_clean.r"""
+        cagr = None
+        if self.n >= 2 and self.first_value and self.first_value > 0 and self.last_value is not None:
+            span = self.last_year - self.first_year
+            if span > 0 and self.last_value >= 0:
+                cagr = (self.last_value / self.first_value) ** (1 / span) - 1
+        volatility = math.sqrt(self.m2_ret / (self.n_ret - 1)) if self.n_ret >= 3 else None
+        max_dd = self.max_drawdown if self.n >= 3 else None
+        slope = intercept = None
+        denom = self.n * self.sxx - self.sx * self.sx
+        if self.n >= 2 and denom:
+            slope = (self.n * self.sxy - self.sx * self.sy) / denom
+            intercept = (self.sy - slope * self.sx) / self.n
+        return {
+            'first_year': self.first_year,
+            'last_year': self.last_year,
+            'last_value': self.last_value,
+            'years': self.n,
+            'cagr': cagr,
+            'volatility': volatility,
+            'max_drawdown': max_dd,
+            'trend_slope': slope,
+            'trend_intercept': intercept,
+        }
+
+    def to_json(self):
+        return json.dumps({field: getattr(self, field) for field in self.FIELDS})
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(**json.loads(text))
+
+
+class PanelStore:
+    """Append-only (table, industry, year, vintage) store with incremental metrics"""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- VINTAGES ----------
+    def vintages(self):
+        rows = self.conn.execute("SELECT vintage FROM vintages ORDER BY vintage").fetchall()
+        return [r[0] for r in rows]
+
+    def latest_vintage(self):
+        row = self.conn.execute("SELECT MAX(vintage) FROM vintages").fetchone()
+        return row[0]
+
+    def version(self):
+        """Changes whenever anything is appended; used as a cache key by derived analyses.
+        Observations are never deleted or updated, so the largest rowid grows with every
+        append; both lookups are a single index seek, not a scan"""
+        row = self.conn.execute(
+            "SELECT (SELECT MAX(vintage) FROM vintages), (SELECT MAX(rowid) FROM observations)"
+        ).fetchone()
+        return f"{row[0]}:{row[1] or 0}"
+
+    # ---------- WRITES ----------
+    def append(self, table, vintage, cells, source=None, complete=False):
+        """
+        Append observations for one vintage.
+
+        cells: iterable of (industry, year, value); value None withdraws a cell.
+        complete=True means cells is the whole table, so stored cells missing from it
+        are withdrawn too. Only the stored cells and series accumulators for the keys
+        being written are read (one indexed query each), and only new or changed cells
+        are written, so re-ingesting the same data writes nothing. New later years
+        update the series accumulators in place; revisions or back-filled years
+        rebuild only the affected series.
+        Returns a summary dict of what changed.
+        """
+        latest = self.latest_vintage()
+        if latest is not None and vintage < latest:
+            raise ValueError(f"Vintage {vintage} is older than the latest stored vintage {latest}")
+
+        summary = {'appended': 0, 'revised': 0, 'unchanged': 0, 'rebuilt_series': 0}
+        with self._lock:
+            incoming = {}
+            for industry, year, value in cells:
+                if value is not None and not math.isfinite(value):
+                    value = None
+                incoming[(industry, int(year))] = value
+            if complete:
+                for key in self._stored_keys(table, vintage):
+                    incoming.setdefault(key, None)
+            stored = self._stored_cells(table, vintage, incoming)
+
+            rows = []
+            changes = {}  # industry -> [(year, value)] of written cells
+            for (industry, year), value in incoming.items():
+                value_now, vintage_now = stored.get((industry, year), (None, None))
+                if value_now == value:
+                    summary['unchanged'] += 1
+                    continue
+                if vintage_now == vintage:
+                    raise ValueError(
+                        f"{table} / {industry} / {year} already has a different value in vintage {vintage}; "
+                        "publish revisions under a new vintage"
+                    )
+                rows.append((table, industry, year, vintage, value))
+                changes.setdefault(industry, []).append((year, value))
+            if not rows:
+                return summary
+
+            states = self._stored_states(table, vintage, industries=changes)
+            state_rows = []
+            for industry, changed in changes.items():
+                changed.sort()
+                state = states.get(industry) or SeriesState()
+                if all(value is not None and (state.last_year is None or year > state.last_year)
+                       for year, value in changed):
+                    for year, value in changed:
+                        state.update(year, value)
+                    summary['appended'] += len(changed)
+                else:
+                    values = self.panel(table, vintage, industry=industry).get(industry, {})
+                    for year, value in changed:
+                        if value is None:
+                            values.pop(year, None)
+                        else:
+                            values[year] = value
+                    state = SeriesState.from_values(values)
+                    summary['revised'] += len(changed)
+                    summary['rebuilt_series'] += 1
+                state_rows.append((table, industry, vintage, state.to_json()))
+
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO vintages VALUES (?, ?, ?)",
+                    (vintage, source, datetime.now().isoformat(timespec='seconds'))
+                )
+                self.conn.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?)", rows)
+                self.conn.executemany("INSERT OR REPLACE INTO series_state VALUES (?, ?, ?, ?)", state_rows)
+        return summary
+
+    def append_year(self, table, year, values_by_industry, vintage, source=None):
+        """Convenience wrapper: add one new year for many industries"""
+        cells = ((industry, year, value) for industry, value in values_by_industry.items())
+        return self.append(table, vintage, cells, source=source)
+
+    def _stored_keys(self, table, as_of):
+        """Every (industry, year) ever stored for the table, read from the primary key index"""
+        return self.conn.execute(
+            "SELECT DISTINCT industry, year FROM observations WHERE table_name = ? AND vintage <= ?",
+            (table, as_of)
+        ).fetchall()
+
+    def _stored_cells(self, table, as_of, keys):
+        """{(industry, year): (value, vintage)} for the latest stored version of the given cells"""
+        # Keys are passed as one JSON array and joined on the primary key, so only those cells are read.
+        # SQLite takes the bare value column from the row that holds MAX(vintage)
+        rows = self.conn.execute(
+            "SELECT k.industry, k.year, o.value, MAX(o.vintage) FROM ("
+            "  SELECT json_extract(value, '$[0]') AS industry, json_extract(value, '$[1]') AS year "
+            "  FROM json_each(?)) k "
+            "JOIN observations o ON o.table_name = ? AND o.industry = k.industry AND o.year = k.year "
+            "AND o.vintage <= ? GROUP BY k.industry, k.year",
+            (json.dumps(list(keys)), table, as_of)
+        ).fetchall()
+        return {(industry, year): (value, vintage) for industry, year, value, vintage in rows}
+
+    def _stored_states(self, table, as_of, industries=None):
+        """{industry: SeriesState} for the latest stored accumulators of every series (or of industries)"""
+        query = ("SELECT s.industry, s.state FROM series_state s "
+                 "WHERE s.table_name = ? AND s.vintage = ("
+                 "  SELECT MAX(i.vintage) FROM series_state i WHERE i.table_name = s.table_name "
+                 "  AND i.industry = s.industry AND i.vintage <= ?)")
+        params = (table, as_of)
+        if industries is not None:
+            query += " AND s.industry IN (SELECT value FROM json_each(?))"
+            params += (json.dumps(list(industries)),)
+        rows = self.conn.execute(query, params).fetchall()
+        return {industry: SeriesState.from_json(state) for industry, state in rows}
+
+    # ---------- READS ----------
+    def panel(self, table, as_of=None, industry=None):
+        """{industry: {year: value}} as published in vintage as_of (default: latest), optionally one industry"""
+        as_of = as_of or self.latest_vintage()
+        if as_of is None:
+            return {}
+        query = ("SELECT o.industry, o.year, o.value FROM observations o "
+                 "WHERE o.table_name = ? AND o.vintage = ("
+                 "  SELECT MAX(i.vintage) FROM observations i WHERE i.table_name = o.table_name "
+                 "  AND i.industry = o.industry AND i.year = o.year AND i.vintage <= ?)")
+        params = (table, as_of)
+        if industry is not None:
+            query += " AND o.industry = ?"
+            params += (industry,)
+        rows = self.conn.execute(query, params).fetchall()
+        panel = {}
+        for industry, year, value in rows:
+            if value is not None:
+                panel.setdefault(industry, {})[year] = value
+        return panel
+
+    def panel_frame(self, table, as_of=None):
+        """Wide pandas DataFrame (industries x years) as of a vintage"""
+        import pandas as pd
+        frame = pd.DataFrame.from_dict(self.panel(table, as_of), orient='index')
+        return frame.reindex(sorted(frame.columns), axis=1).sort_index()
+
+    def metrics(self, table, as_of=None):
+        """{industry: metrics dict} read from the stored accumulators (no recomputation)"""
+        as_of = as_of or self.latest_vintage()
+        if as_of is None:
+            return {}
+        return {industry: state.metrics() for industry, state in self._stored_states(table, as_of).items()}
+
+    def years(self, table, as_of=None):
+        as_of = as_of or self.latest_vintage()
+        rows = self.conn.execute(
+            "SELECT DISTINCT year FROM observations WHERE table_name = ? AND vintage <= ? ORDER BY year",
+            (table, as_of)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+
+# ===== BEA WORKBOOK INGEST =====
+def clean_industry(name):
+    """Same cleanup as clean_ind() in data_analysis_clean.r"""
+    name = re.sub(r"[\r\n]+", " ", str(name)).strip()
+    name = re.sub(r"\s{2,}", " ", name)
+    name = re.sub(r"\.$", "", name)
+    return re.sub(r"\b([0-9])$", "", name)
+
+
+def _to_number(cell):
+    text = re.sub(r"[^0-9.-]", "", str(cell))
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def detect_vintage(workbook, sheet='Table 1'):
+    """Read the 'Last updated: <date>' line from a BEA sheet header as YYYY-MM-DD"""
+    import pandas as pd
+    header = pd.read_excel(workbook, sheet_name=sheet, header=None, nrows=6)
+    for cell in header.iloc[:, 0].astype(str):
+        match = re.search(r"Last updated:\s*(.+)", cell)
+        if match:
+            return datetime.strptime(match.group(1).strip(), "%B %d, %Y").strftime("%Y-%m-%d")
+    return None
+
+
+def _bea_rows(raw):
+    """(industry, depth, row) for each data row; depth comes from the label's indentation"""
+    import pandas as pd
+    level = None
+    for _, row in raw.iloc[1:].iterrows():
+        if pd.isna(row[1]):
+            continue
+        label = str(row[1])
+        depth = (len(label) - len(label.lstrip(" "))) // 4
+        industry = clean_industry(label)
+        # Government rows repeat under Federal and State and local; label them by level
+        # ("General government (Federal)" matches data_analysis_clean.r)
+        if industry in ("Federal", "State and local"):
+            level = "Federal" if industry == "Federal" else "State/Local"
+        elif industry in ("General government", "Government enterprises") and level:
+            industry = f"{industry} ({level})"
+        yield industry, depth, row
+
+
+def _read_bea_sheet(workbook, sheet):
+    import pandas as pd
+    return pd.read_excel(workbook, sheet_name=sheet, header=None, skiprows=5)
+
+
+def read_bea_table(workbook, sheet):
+    """Yield (industry, year, value) cells from one BEA sheet; year columns are detected"""
+    raw = _read_bea_sheet(workbook, sheet)
+    header = raw.iloc[0]
+    year_cols = {
+        col: int(float(header[col])) for col in raw.columns
+        if re.fullmatch(r"\d{4}(\.0)?", str(header[col]).strip())
+    }
+    for industry, _, row in _bea_rows(raw):
+        for col, year in year_cols.items():
+            yield industry, year, _to_number(row[col])
+
+
+def industry_hierarchy(workbook='Business.xlsx', sheet='Table 1'):
+    """{industry: {"depth", "parent", "leaf"}} from the sheet's indentation (totals vs detail rows)"""
+    rows = [(industry, depth) for industry, depth, _ in _bea_rows(_read_bea_sheet(workbook, sheet))]
+    hierarchy = {}
+    parents = []
+    for k, (industry, depth) in enumerate(rows):
+        parents = parents[:depth]
+        next_depth = rows[k + 1][1] if k + 1 < len(rows) else -1
+        hierarchy[industry] = {
+            "depth": depth,
+            "parent": parents[-1] if parents else None,
+            "leaf": next_depth <= depth,
+        }
+        parents.append(industry)
+    return hierarchy
+
+
+def ingest_workbook(store, workbook, vintage=None, tables=DEFAULT_TABLES):
+    """Append every table of a BEA workbook under one vintage; returns per-table summaries"""
+    vintage = vintage or detect_vintage(workbook) or datetime.now().strftime("%Y-%m-%d")
+    summaries = {}
+    for table in tables:
+        # complete=True: cells that disappeared from the release are withdrawn
+        summaries[table] = store.append(table, vintage, read_bea_table(workbook, table),
+                                        source=os.path.basename(workbook), complete=True)
+    return vintage, summaries
+
+
+def panel_version(table='Table 1', as_of=None, workbook='Business.xlsx', store=None):
+    """Cheap cache key for load_panel_matrix(): changes whenever its result would"""
+    store = store or get_store()
+    if store is not None and store.latest_vintage():
+        return f"store:{table}:{as_of or ''}:{store.version()}"
+    stat = os.stat(workbook)
+    return f"workbook:{table}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def load_panel_matrix(table='Table 1', as_of=None, workbook='Business.xlsx', store=None):
+    """
+    (version, industries, years, values) for one table, with values as an
+    industries x years numpy array (NaN where missing). Reads the panel store when
+    something has been ingested, otherwise the workbook directly.
+    """
+    import numpy as np
+
+    store = store or get_store()
+    version = panel_version(table, as_of, workbook, store)
+    if version.startswith("store:"):
+        panel = store.panel(table, as_of)
+    else:
+        panel = {}
+        for industry, year, value in read_bea_table(workbook, table):
+            if value is not None:
+                panel.setdefault(industry, {})[year] = value
+
+    industries = sorted(panel)
+    years = sorted({year for values in panel.values() for year in values})
+    values = np.full((len(industries), len(years)), np.nan)
+    column = {year: j for j, year in enumerate(years)}
+    for i, industry in enumerate(industries):
+        for year, value in panel[industry].items():
+            values[i, column[year]] = value
+    return version, industries, years, values
+
+
+# ===== PROCESS-WIDE INSTANCE =====
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path=STORE_PATH):
+    """Shared store for the app process (None until something has been ingested)"""
+    global _store
+    with _store_lock:
+        if _store is None and os.path.exists(path):
+            _store = PanelStore(path)
+        return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append-only BEA panel store")
+    parser.add_argument('--store', default=STORE_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help='append a BEA workbook release')
+    ingest.add_argument('workbook')
+    ingest.add_argument('--vintage', help='release date YYYY-MM-DD (default: read from the sheet)')
+    ingest.add_argument('--tables', nargs='+', default=list(DEFAULT_TABLES))
+
+    metrics = sub.add_parser('metrics', help='print incremental metrics')
+    metrics.add_argument('--table', default='Table 1')
+    metrics.add_argument('--as-of', dest='as_of')
+
+    sub.add_parser('vintages', help='list stored vintages')
+
+    args = parser.parse_args()
+    store = PanelStore(args.store)
+
+    if args.command == 'ingest':
+        vintage, summaries = ingest_workbook(store, args.workbook, args.vintage, args.tables)
+        print(f"Ingested {args.workbook} as vintage {vintage}")
+        for table, summary in summaries.items():
+            print(f"  {table}: {summary}")
+    elif args.command == 'metrics':
+        print(f"{'Industry':<60} {'Years':>9} {'CAGR':>8} {'Vol':>8} {'MaxDD':>8}")
+        for industry, m in sorted(store.metrics(args.table, args.as_of).items()):
+            fmt = lambda v: f"{v * 100:7.1f}%" if v is not None else f"{'—':>8}"
+            span = f"{m['first_year']}-{m['last_year']}"
+            print(f"{industry[:60]:<60} {span:>9} {fmt(m['cagr'])} {fmt(m['volatility'])} {fmt(m['max_drawdown'])}")
+    elif args.command == 'vintages':
+        for vintage in store.vintages():
+            print(vintage)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+📈 Sector covariance model and diversified portfolio optimizer
+Builds a YoY log-return matrix over the leaf industries of the BEA panel, a
+Ledoit-Wolf shrinkage covariance (cached once per data version), and solves
+minimum-variance, mean-variance and maximum-diversification allocations under a
+max-weight cap and a required share in 2020-resilient industries. The efficient
+frontier is solved for every risk-aversion level at once.
+
+Usage:
+    python portfolio.py                                  # all three strategies + frontier
+    python portfolio.py --max-weight 0.2 --resilient-share 0.5
+"""
+
+import argparse
+import re
+import threading
+
+import numpy as np
+
+from panel_store import load_panel_matrix, panel_version, industry_hierarchy
+from event_study import get_event_study
+from question_patterns import STRATEGIES
+
+DEFAULT_PORTFOLIO_CONFIG = {
+    "max_weight": 0.25,       # cap on any one industry
+    "resilient_share": 0.30,  # minimum total weight in 2020-resilient industries
+    "risk_aversion": 4.0,     # mean-variance trade-off for the "balanced" portfolio
+    "min_level": 10.0,        # $M; BEA rounds to whole millions, so tiny series' returns are noise
+    "resilient_within": 1,    # years to regain the 2019 level after the 2020 shock
+}
+
+FRONTIER_RISK_AVERSIONS = np.logspace(-1, 2.5, 24)
+
+
+# ===== COVARIANCE =====
+def ledoit_wolf_constant_correlation(returns):
+    """
+    Ledoit & Wolf (2003) shrinkage of the sample covariance toward a constant-correlation
+    target. returns is observations x assets; gives (covariance, shrinkage intensity).
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    var = np.diag(sample)
+    sd = np.sqrt(var)
+    r_bar = ((sample / np.outer(sd, sd)).sum() - n) / (n * (n - 1))
+    target = r_bar * np.outer(sd, sd)
+    np.fill_diagonal(target, var)
+
+    y = x ** 2
+    pi_mat = y.T @ y / t - sample ** 2
+    pi_hat = pi_mat.sum()
+    gamma_hat = ((target - sample) ** 2).sum()
+    theta = (x ** 3).T @ x / t - var[:, None] * sample
+    np.fill_diagonal(theta, 0.0)
+    rho_hat = np.trace(pi_mat) + r_bar * ((sd[None, :] / sd[:, None]) * theta).sum()
+    kappa = (pi_hat - rho_hat) / gamma_hat if gamma_hat > 0 else 0.0
+    shrinkage = float(min(1.0, max(0.0, kappa / t)))
+    return shrinkage * target + (1 - shrinkage) * sample, shrinkage
+
+
+class ReturnModel:
+    """Expected returns, shrunk covariance and resilience flags for the investable universe"""
+
+    def __init__(self, version, industries, years, returns, resilient):
+        self.version = version
+        self.industries = industries
+        self.years = years
+        self.returns = returns                      # assets x years-1 (log)
+        self.mu = returns.mean(axis=1)
+        self.cov, self.shrinkage = ledoit_wolf_constant_correlation(returns.T)
+        self.vol = np.sqrt(np.diag(self.cov))
+        self.resilient = resilient                  # bool per asset
+        self.lipschitz = float(np.linalg.eigvalsh(self.cov)[-1])
+
+
+def build_return_model(version, industries, years, values, hierarchy, resilient_names,
+                       min_level=DEFAULT_PORTFOLIO_CONFIG["min_level"]):
+    """
+    Leaf industries with a full, non-trivial history; totals (and the top-level addendum
+    rows) would double-count their parts
+    """
+    keep = np.array([
+        hierarchy.get(name, {}).get("leaf", False) and hierarchy[name]["depth"] > 0 for name in industries
+    ]) & np.all(np.isfinite(values) & (values >= min_level), axis=1)
+    names = [name for name, k in zip(industries, keep) if k]
+    returns = np.diff(np.log(values[keep]), axis=1)
+    resilient = np.array([name in resilient_names for name in names])
+    return ReturnModel(version, names, years, returns, resilient)
+
+
+# ===== PROCESS-WIDE CACHE =====
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_return_model(table="Table 1", resilient_within=DEFAULT_PORTFOLIO_CONFIG["resilient_within"]):
+    """The return model for the current data version, built once and reused across sessions"""
+    version = panel_version(table)
+    key = (version, table, resilient_within)
+    with _models_lock:
+        if key not in _models:
+            _models.clear()
+            _, industries, years, values = load_panel_matrix(table)
+            study = get_event_study()
+            shock = study.window_index((2020, 2020))
+            resilient_names = {
+                name for name, years_back in zip(study.industries, study.recovery[:, shock])
+                if years_back <= resilient_within
+            }
+            _models[key] = build_return_model(version, industries, years, values,
+                                              industry_hierarchy(sheet=table), resilient_names)
+        return _models[key]
+
+
+# ===== CONSTRAINTS =====
+def project_capped_simplex(y, upper, totals):
+    """
+    Row-wise Euclidean projection onto {0 <= w <= upper, sum(w) = total}. The projection is
+    w = clip(y - tau, 0, upper); sum(w) is piecewise linear in tau with breakpoints at y and
+    y - upper, so tau is found exactly by evaluating every breakpoint and interpolating.
+    y is rows x assets.
+    """
+    breaks = np.sort(np.concatenate([y, y - upper], axis=1), axis=1)           # rows x 2n
+    sums = np.clip(y[:, None, :] - breaks[:, :, None], 0.0, upper).sum(axis=2)  # non-increasing
+    j = np.clip((sums >= totals[:, None]).sum(axis=1) - 1, 0, breaks.shape[1] - 2)
+    rows = np.arange(len(y))
+    b0, b1 = breaks[rows, j], breaks[rows, j + 1]
+    g0, g1 = sums[rows, j], sums[rows, j + 1]
+    slope = np.where(g0 > g1, (b1 - b0) / np.where(g0 > g1, g0 - g1, 1.0), 0.0)
+    tau = b0 + (g0 - totals) * slope
+    return np.clip(y - tau[:, None], 0.0, upper)
+
+
+def project(y, resilient, upper, share):
+    """
+    Projection onto the fully-invested, capped set with at least `share` in resilient assets.
+    Rows that already meet the share keep the plain projection; otherwise the share
+    constraint is tight, so each group is projected onto its own budget.
+    """
+    w = project_capped_simplex(y, upper, np.ones(len(y)))
+    short = w[:, resilient].sum(axis=1) < share - 1e-12
+    if share > 0 and short.any():
+        rows = y[short]
+        fixed = np.empty_like(rows)
+        fixed[:, resilient] = project_capped_simplex(rows[:, resilient], upper, np.full(len(rows), share))
+        fixed[:, ~resilient] = project_capped_simplex(rows[:, ~resilient], upper, np.full(len(rows), 1 - share))
+        w[short] = fixed
+    return w
+
+
+def check_feasible(model, max_weight, resilient_share):
+    n_res = int(model.resilient.sum())
+    n_other = len(model.industries) - n_res
+    if max_weight * len(model.industries) < 1:
+        raise ValueError(f"max weight {max_weight:.0%} cannot fully invest {len(model.industries)} industries")
+    if resilient_share > n_res * max_weight or 1 - resilient_share > n_other * max_weight:
+        raise ValueError(f"a {resilient_share:.0%} resilient share is not reachable with {n_res} resilient "
+                         f"industries at a {max_weight:.0%} cap")
+
+
+# ===== SOLVERS =====
+def solve_quadratic(model, return_weights, risk_aversions, max_weight, resilient_share,
+                    iterations=2000, tol=1e-8, expected=None, start=None):
+    """
+    Accelerated projected gradient (FISTA with adaptive restart) for
+    min -a*mu'w + (lam/2) w'Cov w, solved for every (a, lam) row at once;
+    returns rows x assets weights. `expected` replaces mu (max diversification uses vol);
+    `start` warm-starts every row from one weight vector.
+    """
+    check_feasible(model, max_weight, resilient_share)
+    mu = model.mu if expected is None else expected
+    a = np.atleast_1d(np.asarray(return_weights, dtype=float))[:, None]
+    lam = np.atleast_1d(np.asarray(risk_aversions, dtype=float))[:, None]
+    step = 1.0 / (lam * model.lipschitz)
+    n = len(model.industries)
+    initial = np.full(n, 1.0 / n) if start is None else start
+    w = project(np.tile(initial, (len(lam), 1)), model.resilient, max_weight, resilient_share)
+    z, t = w.copy(), np.ones((len(lam), 1))
+    for _ in range(iterations):
+        grad = -a * mu + lam * (z @ model.cov)
+        w_next = project(z - step * grad, model.resilient, max_weight, resilient_share)
+        # Adaptive restart: drop the momentum of rows where it points uphill
+        restart = ((grad * (w_next - w)).sum(axis=1, keepdims=True) > 0)
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        z = w_next + ((t - 1) / t_next) * (w_next - w)
+        moved = np.abs(w_next - w).max()
+        w, t = w_next, t_next
+        if moved < tol:
+            break
+    return w
+
+
+def solve_max_diversification(model, max_weight, resilient_share, rounds=3, points=8):
+    """
+    Maximise w'vol / sqrt(w'Cov w). Like max Sharpe with vol in place of returns, the optimum
+    is the tangency point of the frontier max vol'w - (g/2) w'Cov w, so each round solves a
+    batch of g values at once (loosely) and zooms in; the best g is then solved exactly.
+    """
+    lo, hi = -1.0, 4.0
+    best_w, best_g, best = None, None, -np.inf
+    for _ in range(rounds):
+        gammas = np.logspace(lo, hi, points)
+        weights = solve_quadratic(model, np.ones(points), gammas, max_weight, resilient_share,
+                                  tol=1e-5, expected=model.vol, start=best_w)
+        ratios = (weights @ model.vol) / np.sqrt(np.einsum("ki,ij,kj->k", weights, model.cov, weights))
+        k = int(np.argmax(ratios))
+        if ratios[k] > best:
+            best_w, best_g, best = weights[k], gammas[k], ratios[k]
+        logs = np.log10(gammas)
+        lo, hi = logs[max(k - 1, 0)], logs[min(k + 1, points - 1)]
+    return solve_quadratic(model, 1.0, best_g, max_weight, resilient_share,
+                           expected=model.vol, start=best_w)[0]
+
+
+def diversification_ratio(model, w):
+    return float((w @ model.vol) / np.sqrt(w @ model.cov @ w))
+
+
+def portfolio_stats(model, w):
+    """Annualised expected return and volatility (YoY log-return model) and concentration"""
+    variance = float(w @ model.cov @ w)
+    return {
+        "expected_return": float(np.expm1(w @ model.mu)),
+        "volatility": float(np.sqrt(variance)),
+        "diversification_ratio": diversification_ratio(model, w),
+        "resilient_share": float(w[model.resilient].sum()),
+        "effective_holdings": float(1.0 / (w ** 2).sum()),
+    }
+
+
+def optimize(model, strategy="mean_variance", max_weight=None, resilient_share=None, risk_aversion=None):
+    """One allocation: {"strategy", "weights": [(industry, weight)], **portfolio_stats}"""
+    cfg = DEFAULT_PORTFOLIO_CONFIG
+    max_weight = cfg["max_weight"] if max_weight is None else max_weight
+    resilient_share = cfg["resilient_share"] if resilient_share is None else resilient_share
+    risk_aversion = cfg["risk_aversion"] if risk_aversion is None else risk_aversion
+    if strategy == "min_variance":
+        w = solve_quadratic(model, 0.0, 1.0, max_weight, resilient_share)[0]
+    elif strategy == "mean_variance":
+        w = solve_quadratic(model, 1.0, risk_aversion, max_weight, resilient_share)[0]
+    elif strategy == "max_diversification":
+        w = solve_max_diversification(model, max_weight, resilient_share)
+    else:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose one of: {', '.join(STRATEGIES)}")
+    order = np.argsort(-w)
+    weights = [(model.industries[i], float(w[i])) for i in order if w[i] > 1e-4]
+    return {"strategy": strategy, "weights": weights, **portfolio_stats(model, w)}
+
+
+def efficient_frontier(model, risk_aversions=FRONTIER_RISK_AVERSIONS, max_weight=None, resilient_share=None):
+    """Mean-variance portfolios for every risk aversion in one batched solve, riskiest first"""
+    cfg = DEFAULT_PORTFOLIO_CONFIG
+    max_weight = cfg["max_weight"] if max_weight is None else max_weight
+    resilient_share = cfg["resilient_share"] if resilient_share is None else resilient_share
+    lam = np.asarray(risk_aversions, dtype=float)
+    weights = solve_quadratic(model, np.ones_like(lam), lam, max_weight, resilient_share)
+    returns = np.expm1(weights @ model.mu)
+    vols = np.sqrt(np.einsum("ki,ij,kj->k", weights, model.cov, weights))
+    return [
+        {"risk_aversion": float(l), "expected_return": float(r), "volatility": float(v), "weights": w}
+        for l, r, v, w in zip(lam, returns, vols, weights)
+    ]
+
+
+# ===== FORMATTING =====
+def _short(name, width=48):
+    name = re.sub(r"\d+$", "", name)  # BEA footnote digits
+    return name if len(name) <= width else name[:width - 1] + "…"
+
+
+def format_portfolio(model, result, holdings=6):
+    lines = [
+        f"**{STRATEGIES[result['strategy']]}** - Expected return {result['expected_return']:+.1%}/yr · "
+        f"Volatility {result['volatility']:.1%} · Diversification ratio {result['diversification_ratio']:.2f} · "
+        f"Resilient share {result['resilient_share']:.0%}"
+    ]
+    for name, weight in result["weights"][:holdings]:
+        flag = " 🛡️" if model.resilient[model.industries.index(name)] else ""
+        lines.append(f"• {_short(name)}: {weight:.1%}{flag}")
+    rest = result["weights"][holdings:]
+    if rest:
+        lines.append(f"• {len(rest)} more holdings: {sum(w for _, w in rest):.1%}")
+    return "\n".join(lines)
+
+
+def format_frontier(frontier, points=5):
+    picks = np.linspace(0, len(frontier) - 1, points).round().astype(int)
+    lines = ["| Risk aversion | Expected return | Volatility |", "|---|---|---|"]
+    for k in picks:
+        p = frontier[k]
+        lines.append(f"| {p['risk_aversion']:.1f} | {p['expected_return']:+.1%} | {p['volatility']:.1%} |")
+    return "\n".join(lines)
+
+
+def format_report(model, strategies=tuple(STRATEGIES), max_weight=None, resilient_share=None,
+                  risk_aversion=None, frontier=True):
+    """Markdown answer used by the chatbot's portfolio fast path and sidebar button"""
+    cfg = DEFAULT_PORTFOLIO_CONFIG
+    max_weight = cfg["max_weight"] if max_weight is None else max_weight
+    resilient_share = cfg["resilient_share"] if resilient_share is None else resilient_share
+    parts = [
+        "📈 **DIVERSIFIED SPACE ECONOMY PORTFOLIOS:**\n",
+        f"Universe: {len(model.industries)} detailed industries ({int(model.resilient.sum())} resilient 🛡️: "
+        f"back at 2019 levels within a year of the 2020 shock) · {model.years[0]}-{model.years[-1]} YoY real "
+        f"value added · covariance shrinkage {model.shrinkage:.0%}",
+        f"Constraints: max {max_weight:.0%} per industry · at least {resilient_share:.0%} in resilient industries\n",
+    ]
+    for strategy in strategies:
+        result = optimize(model, strategy, max_weight, resilient_share, risk_aversion)
+        parts.append(format_portfolio(model, result) + "\n")
+    if frontier:
+        parts.append("📊 **EFFICIENT FRONTIER:**\n")
+        parts.append(format_frontier(efficient_frontier(model, max_weight=max_weight,
+                                                        resilient_share=resilient_share)))
+    parts.append("\n💡 Returns are growth in real value added, not market returns; treat allocations as "
+                 "sector exposure guidance.")
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diversified sector portfolios over the BEA panel")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), action="append")
+    parser.add_argument("--max-weight", type=float, default=DEFAULT_PORTFOLIO_CONFIG["max_weight"])
+    parser.add_argument("--resilient-share", type=float, default=DEFAULT_PORTFOLIO_CONFIG["resilient_share"])
+    parser.add_argument("--risk-aversion", type=float, default=DEFAULT_PORTFOLIO_CONFIG["risk_aversion"])
+    parser.add_argument("--table", default="Table 1")
+    args = parser.parse_args()
+
+    model = get_return_model(args.table)
+    try:
+        print(format_report(model, tuple(args.strategy or STRATEGIES), args.max_weight,
+                            args.resilient_share, args.risk_aversion))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+🧭 Chat question routing without the heavy modules
+Recognises portfolio requests and shock-window questions with plain regexes, so
+the chatbot only imports numpy, the event study or the portfolio optimizer when
+a question actually needs them.
+"""
+
+import re
+
+# ===== PORTFOLIOS =====
+STRATEGIES = {
+    "min_variance": "Minimum Variance",
+    "mean_variance": "Balanced (Mean-Variance)",
+    "max_diversification": "Maximum Diversification",
+}
+
+# Chat phrasing -> strategy / constraints
+PORTFOLIO_QUESTION_PATTERN = re.compile(r"portfolio|basket|diversif|allocat|frontier", re.IGNORECASE)
+STRATEGY_PATTERNS = [
+    ("min_variance", re.compile(r"min(imum)?[- ]?var|lowest[- ]risk|least risk|safest", re.IGNORECASE)),
+    ("max_diversification", re.compile(r"max(imum|imise|imize)?[- ]?divers|most diversified", re.IGNORECASE)),
+    ("mean_variance", re.compile(r"mean[- ]?variance|balanced|best return", re.IGNORECASE)),
+]
+MAX_WEIGHT_PATTERN = re.compile(r"(?:max(?:imum)?|cap|no more than|at most|up to)\D{0,25}?(\d+(?:\.\d+)?)\s*%",
+                                re.IGNORECASE)
+RESILIENT_SHARE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%[^%\d]{0,30}resilien|resilien[^%\d]{0,30}?(\d+(?:\.\d+)?)\s*%",
+                                     re.IGNORECASE)
+
+
+def parse_portfolio_request(text):
+    """Strategy and constraints asked for in a chat message, or None if it is not about portfolios"""
+    if not PORTFOLIO_QUESTION_PATTERN.search(text):
+        return None
+    request = {"strategies": tuple(STRATEGIES), "frontier": True}
+    chosen = tuple(name for name, pattern in STRATEGY_PATTERNS if pattern.search(text))
+    if chosen:
+        request["strategies"] = chosen
+        request["frontier"] = bool(re.search(r"frontier", text, re.IGNORECASE))
+    elif re.search(r"frontier", text, re.IGNORECASE):
+        request["strategies"] = ()
+    share = RESILIENT_SHARE_PATTERN.search(text)
+    if share:
+        request["resilient_share"] = float(share.group(1) or share.group(2)) / 100
+    cap = MAX_WEIGHT_PATTERN.search(text)
+    if cap and not (share and cap.start() >= share.start() and cap.end() <= share.end()):
+        request["max_weight"] = float(cap.group(1)) / 100
+    return request
+
+
+# ===== SHOCK WINDOWS =====
+# "2013", "2020-2021", "2020 to 2022"
+WINDOW_PATTERN = re.compile(r"\b((?:19|20)\d{2})(?:\s*(?:-|–|to|through)\s*((?:19|20)\d{2}))?\b")
+# A year alone ("recovery outlook for 2030") is not a shock question: it also needs a
+# shock term, or a resilience word about a window that covers the 2020 shock
+SHOCK_TERM_PATTERN = re.compile(r"shock|covid|pandemic|drawdown|downturn|crisis|recession|crash", re.IGNORECASE)
+SHOCK_QUESTION_PATTERN = re.compile(r"resilien|withst|weather|recover|surviv", re.IGNORECASE)
+
+
+def parse_windows(text):
+    """Shock windows named in free text: "2013" -> (2013, 2013), "2020-2021" -> (2020, 2021)"""
+    windows = []
+    for match in WINDOW_PATTERN.finditer(text):
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        windows.append((min(start, end), max(start, end)))
+    return windows
+
+
+def shock_windows(question):
+    """Shock windows a question asks about, or [] if it is not a shock question"""
+    windows = parse_windows(question)
+    covers_2020 = any(start <= 2020 <= end for start, end in windows)
+    if not windows or not (SHOCK_TERM_PATTERN.search(question)
+                           or (covers_2020 and SHOCK_QUESTION_PATTERN.search(question))):
+        return []
+    return windows
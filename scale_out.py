@@ -0,0 +1,615 @@
+"""
+🏭 Scale-out analysis for large panels (state-level, firm-level, synthetic)
+Applies the per-series methodology of data_analysis_clean.r (CAGR, volatility,
+drawdown, 2020 recovery, productivity trend, shock drop, drift+AR(1) backtest
+MAPE, then min-max scoring) to 10^5-10^6 series. Series are processed in
+fixed-size blocks across a process pool with bounded memory:
+
+  pass 1  per-block raw metrics (heavy, parallel) -> block files + mergeable
+          summaries (min/max, moments, quantile sketches for the median imputation)
+  pass 2  per-block normalisation and scores with the global summaries
+          (light, parallel) -> top-N candidates per block, merged with a heap;
+          the Overall ranking needs the composite score ranges, so it is picked
+          in a final sweep over the stored composite columns
+
+A panel is a directory with values.npy (series x years, NaN = missing), optional
+employment.npy, and meta.json ({"years": [...], "names": [...] optional}).
+
+Usage:
+    python scale_out.py generate --series 1000000 --out panels/synthetic_1m
+    python scale_out.py run panels/synthetic_1m --workers 4 --top 10
+    python scale_out.py run --workbook Business.xlsx            # national BEA tables
+    python scale_out.py benchmark --series 10000 100000 1000000 --workers 1 2 4
+"""
+
+import argparse
+import heapq
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_SCALE_CONFIG = {
+    "block_size": 50000,    # series per task; memory per worker grows linearly with it
+    "workers": os.cpu_count() or 1,
+    "top_n": 10,
+    "shock_year": 2020,     # rec_fun / Drop2020
+    "train_end": 2018,      # make_forecasts: train <= 2018, test >= 2019
+    "sketch_points": 257,   # quantiles kept per block for the median imputation
+}
+
+METRICS = ["cagr", "volatility", "max_dd", "recovery", "prod_slope", "shock_drop", "mape"]
+COMPOSITES = ["growth", "resilience", "investability"]
+
+# Rankings that survive the final rescaling, so each block's candidates can be merged
+RANKINGS = {
+    "investability": ("composite", "investability", "desc"),
+    "growth": ("composite", "growth", "desc"),
+    "resilience": ("composite", "resilience", "desc"),
+    "shock": ("metric", "shock_drop", "desc"),   # smallest fall through the shock year
+    "predictable": ("metric", "mape", "asc"),
+}
+RANKING_TITLES = {
+    "overall": "Top by Overall Score",
+    "investability": "Top by Investability",
+    "growth": "Growth Leaders",
+    "resilience": "Most Resilient (recovery, volatility, drawdown)",
+    "shock": "Most Resilient to the Shock Year",
+    "predictable": "Most Predictable (lowest backtest MAPE)",
+}
+
+
+# ===== PANELS =====
+def load_meta(panel):
+    with open(os.path.join(panel, "meta.json")) as f:
+        return json.load(f)
+
+
+def write_meta(panel, meta):
+    with open(os.path.join(panel, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def _read_block(panel, name, start, stop):
+    """Copy one block out of a memory-mapped array and release the mapping"""
+    path = os.path.join(panel, name)
+    if not os.path.exists(path):
+        return None
+    mapped = np.load(path, mmap_mode="r")
+    block = np.array(mapped[start:stop], dtype=np.float64)
+    del mapped
+    return block
+
+
+def _synthetic_block(seed, block_index, n, years, shock_year, missing_rate):
+    """Log-level random walks with heterogeneous drift/volatility and a decaying shock"""
+    rng = np.random.default_rng([seed, block_index])
+    t = len(years)
+    level0 = rng.lognormal(mean=4.0, sigma=2.0, size=n)                  # $M
+    drift = rng.normal(0.03, 0.04, size=(n, 1))
+    vol = rng.lognormal(np.log(0.08), 0.6, size=(n, 1))
+    steps = drift + vol * rng.standard_normal((n, t - 1))
+    log_level = np.log(level0)[:, None] + np.concatenate([np.zeros((n, 1)), np.cumsum(steps, axis=1)], axis=1)
+    if shock_year in years:
+        s = years.index(shock_year)
+        hit = -np.abs(rng.normal(0.06, 0.12, size=(n, 1)))
+        persistence = rng.uniform(0.3, 1.0, size=(n, 1))
+        after = np.arange(t - s)[None, :]
+        log_level[:, s:] += hit * persistence ** after
+    values = np.exp(log_level)
+
+    productivity0 = rng.lognormal(np.log(0.15), 0.5, size=(n, 1))        # $M per job
+    productivity_growth = rng.normal(0.01, 0.02, size=(n, 1))
+    productivity = productivity0 * np.exp(productivity_growth * np.arange(t) + rng.normal(0, 0.02, size=(n, t)))
+    employment = values / productivity
+
+    missing = rng.random((n, t)) < missing_rate
+    late_start = rng.random(n) < 0.01                                     # series that begin later
+    missing[late_start, :3] = True
+    values[missing] = np.nan
+    employment[missing] = np.nan
+    return values.astype(np.float32), employment.astype(np.float32)
+
+
+def _generate_block(args):
+    panel, seed, k, start, stop, years, shock_year, missing_rate = args
+    values, employment = _synthetic_block(seed, k, stop - start, years, shock_year, missing_rate)
+    out_values = np.load(os.path.join(panel, "values.npy"), mmap_mode="r+")
+    out_employment = np.load(os.path.join(panel, "employment.npy"), mmap_mode="r+")
+    out_values[start:stop] = values
+    out_employment[start:stop] = employment
+    out_values.flush()
+    out_employment.flush()
+    return stop - start
+
+
+def generate_panel(panel, n_series, years=range(2012, 2024), seed=0, missing_rate=0.02,
+                   block_size=DEFAULT_SCALE_CONFIG["block_size"], workers=1,
+                   shock_year=DEFAULT_SCALE_CONFIG["shock_year"]):
+    """Write a reproducible synthetic panel block by block (same output for any worker count)"""
+    years = list(years)
+    os.makedirs(panel, exist_ok=True)
+    for name in ("values.npy", "employment.npy"):
+        np.lib.format.open_memmap(os.path.join(panel, name), mode="w+", dtype=np.float32,
+                                  shape=(n_series, len(years))).flush()
+    tasks = [(panel, seed, k, start, min(start + block_size, n_series), years, shock_year, missing_rate)
+             for k, start in enumerate(range(0, n_series, block_size))]
+    _map(_generate_block, tasks, workers)
+    write_meta(panel, {"years": years, "source": f"synthetic(seed={seed}, missing_rate={missing_rate})"})
+    return panel
+
+
+def panel_from_workbook(panel, workbook="Business.xlsx"):
+    """National BEA panel (Table 1 real value added, Table 7 employment) in panel format"""
+    from panel_store import load_panel_matrix
+
+    _, industries, years, values = load_panel_matrix("Table 1", workbook=workbook)
+    _, emp_industries, emp_years, emp_values = load_panel_matrix("Table 7", workbook=workbook)
+    employment = np.full_like(values, np.nan)
+    emp_row = {name: i for i, name in enumerate(emp_industries)}
+    emp_col = {year: j for j, year in enumerate(emp_years)}
+    for i, name in enumerate(industries):
+        if name in emp_row:
+            for j, year in enumerate(years):
+                if year in emp_col:
+                    employment[i, j] = emp_values[emp_row[name], emp_col[year]]
+    os.makedirs(panel, exist_ok=True)
+    np.save(os.path.join(panel, "values.npy"), values.astype(np.float32))
+    np.save(os.path.join(panel, "employment.npy"), employment.astype(np.float32))
+    write_meta(panel, {"years": years, "names": industries, "source": os.path.basename(workbook)})
+    return panel
+
+
+# ===== PASS 1: RAW METRICS =====
+def _prev_valid(x):
+    """For each cell, the latest non-missing value strictly before it in the row (NaN if none)"""
+    valid = np.isfinite(x)
+    idx = np.where(valid, np.arange(x.shape[1]), -1)
+    last = np.maximum.accumulate(idx, axis=1)
+    prev = np.concatenate([np.full((len(x), 1), -1), last[:, :-1]], axis=1)
+    out = np.take_along_axis(x, np.clip(prev, 0, None), axis=1)
+    out[prev < 0] = np.nan
+    return out
+
+
+def _ols(x, y, mask):
+    """Row-wise least squares y ~ a + b x over masked points: (a, b, n); b is NaN if x is constant"""
+    n = mask.sum(axis=1)
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+    x_bar = xm.sum(axis=1) / n
+    y_bar = ym.sum(axis=1) / n
+    dx = np.where(mask, x - x_bar[:, None], 0.0)
+    dy = np.where(mask, y - y_bar[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    b = np.where(sxx > 0, (dx * dy).sum(axis=1) / np.where(sxx > 0, sxx, 1.0), np.nan)
+    return y_bar - b * x_bar, b, n
+
+
+def compute_block_metrics(values, employment, years, shock_year, train_end):
+    """The per-series metrics of data_analysis_clean.r for a block (series x years)"""
+    years_arr = np.asarray(years, dtype=float)
+    t = len(years)
+    grid = np.broadcast_to(years_arr, values.shape)
+    valid = np.isfinite(values)
+    out = np.full((len(values), len(METRICS)), np.nan)
+
+    with np.errstate(all="ignore"):
+        # CAGR between the first and last year (cagr_fun)
+        v0, v1 = values[:, 0], values[:, -1]
+        out[:, 0] = np.where(v0 > 0, (v1 / v0) ** (1.0 / (t - 1)) - 1, np.nan)
+
+        # Volatility: SD of YoY % returns between consecutive observations, >= 3 returns (vol_fun)
+        returns = (values - _prev_valid(values)) / _prev_valid(values)
+        ok = np.isfinite(returns)
+        n = ok.sum(axis=1)
+        mean = np.where(ok, returns, 0.0).sum(axis=1) / n
+        var = np.where(ok, (returns - mean[:, None]) ** 2, 0.0).sum(axis=1) / (n - 1)
+        out[:, 1] = np.where(n >= 3, np.sqrt(var), np.nan)
+
+        # Max drawdown vs running peak, >= 3 observations (dd_fun)
+        peak = np.fmax.accumulate(values, axis=1)
+        drawdown = (values - peak) / peak
+        worst = np.where(valid & ~np.isnan(drawdown), drawdown, np.inf).min(axis=1)
+        out[:, 2] = np.where((valid.sum(axis=1) >= 3) & ~np.isposinf(worst), worst, np.nan)
+
+        # Years to regain the pre-shock level (rec_fun)
+        if shock_year in years and shock_year - 1 in years:
+            s = years.index(shock_year)
+            base = values[:, s - 1]
+            post = valid & (grid >= shock_year)
+            back = post & (values >= base[:, None])
+            first = back.argmax(axis=1)
+            recovery = np.where(back.any(axis=1), years_arr[first] - shock_year, np.inf)
+            recovery = np.where((post & ~back).any(axis=1), recovery, 0.0)
+            out[:, 3] = np.where(post.any(axis=1) & np.isfinite(base), recovery, np.nan)
+            out[:, 5] = (values[:, s] - base) / base
+            out[~np.isfinite(out[:, 5]), 5] = np.nan
+
+        # Productivity trend: slope of log(value / employment) on year, >= 3 points
+        if employment is not None:
+            log_prod = np.log(values / employment)
+            _, slope, n = _ols(grid, log_prod, np.isfinite(log_prod))
+            out[:, 4] = np.where(n >= 3, slope, np.nan)
+
+        # Backtest MAPE of the drift + AR(1) average (make_forecasts)
+        positive = valid & (values > 0)
+        train = positive & (grid <= train_end)
+        test = positive & (grid > train_end)
+        usable = (positive.sum(axis=1) >= 5) & (train.sum(axis=1) >= 3) & (test.sum(axis=1) >= 1)
+        log_values = np.where(positive, np.log(np.where(positive, values, 1.0)), np.nan)
+        a_drift, b_drift, _ = _ols(grid, log_values, train)
+        drift_fc = np.exp(a_drift[:, None] + b_drift[:, None] * grid)
+
+        train_log = np.where(train, log_values, np.nan)
+        lagged = _prev_valid(train_log)
+        a_ar, b_ar, _ = _ols(lagged, train_log, train & np.isfinite(lagged))
+        last_idx = np.where(train, np.arange(t), -1).max(axis=1)
+        current = np.take_along_axis(log_values, np.clip(last_idx, 0, None)[:, None], axis=1)[:, 0]
+        path = np.empty((len(values), t))
+        for step in range(t):
+            current = a_ar + b_ar * current
+            path[:, step] = current
+        step_of = np.clip(np.cumsum(test, axis=1) - 1, 0, t - 1)
+        forecast = (drift_fc + np.exp(np.take_along_axis(path, step_of, axis=1))) / 2
+        ape = np.where(test, np.abs(forecast - values) / values, np.nan)
+        ape_ok = ~np.isnan(ape)
+        mape = np.where(ape_ok, ape, 0.0).sum(axis=1) / ape_ok.sum(axis=1)
+        out[:, 6] = np.where(usable, mape, np.nan)
+    return out
+
+
+def _sketch(x, points):
+    """Quantile sketch of the non-missing values (inf kept: unrecovered series sort last)"""
+    x = x[~np.isnan(x)]
+    if len(x) == 0:
+        return {"count": 0, "points": []}
+    q = np.quantile(x, np.linspace(0, 1, points), method="inverted_cdf")
+    return {"count": int(len(x)), "points": q.tolist()}
+
+
+def _pass1_block(args):
+    panel, workdir, k, start, stop, years, config = args
+    values = _read_block(panel, "values.npy", start, stop)
+    employment = _read_block(panel, "employment.npy", start, stop)
+    metrics = compute_block_metrics(values, employment, years, config["shock_year"], config["train_end"])
+    np.save(os.path.join(workdir, f"metrics_{k:05d}.npy"), metrics)
+
+    summary = {}
+    for j, name in enumerate(METRICS):
+        col = metrics[:, j]
+        finite = col[np.isfinite(col)]
+        summary[name] = {
+            "min": float(finite.min()) if len(finite) else None,
+            "max": float(finite.max()) if len(finite) else None,
+            "any_inf": bool(np.isinf(col).any()),
+            "sketch": _sketch(col, config["sketch_points"]),
+        }
+    cagr = metrics[:, 0][np.isfinite(metrics[:, 0])]
+    summary["cagr_moments"] = [int(len(cagr)), float(cagr.sum()), float((cagr ** 2).sum())]
+    return summary
+
+
+def _weighted_median(sketches):
+    points, weights = [], []
+    for sketch in sketches:
+        if sketch["count"]:
+            points.extend(sketch["points"])
+            weights.extend([sketch["count"] / len(sketch["points"])] * len(sketch["points"]))
+    if not points:
+        return None
+    order = np.argsort(points)
+    cumulative = np.cumsum(np.asarray(weights)[order])
+    return float(np.asarray(points)[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+
+
+def merge_pass1(summaries):
+    """Global ranges, medians (from the block sketches) and CAGR moments"""
+    globals_ = {}
+    for name in METRICS:
+        parts = [s[name] for s in summaries]
+        mins = [p["min"] for p in parts if p["min"] is not None]
+        maxs = [p["max"] for p in parts if p["max"] is not None]
+        globals_[name] = {
+            "min": min(mins) if mins else None,
+            "max": max(maxs) if maxs else None,
+            "any_inf": any(p["any_inf"] for p in parts),
+            "median": _weighted_median([p["sketch"] for p in parts]),
+        }
+    rec = globals_["recovery"]
+    if rec["max"] is not None:
+        # RecClean: unrecovered series count as 2 years beyond the slowest recovery
+        rec["clean_max"] = rec["max"] + 2 if rec["any_inf"] else rec["max"]
+        if rec["median"] is not None and np.isinf(rec["median"]):
+            rec["median"] = rec["clean_max"]
+    n, total, squares = np.sum([s["cagr_moments"] for s in summaries], axis=0)
+    globals_["cagr_mean"] = total / n if n else 0.0
+    globals_["cagr_sd"] = float(np.sqrt((squares - n * globals_["cagr_mean"] ** 2) / (n - 1))) if n > 1 else 0.0
+    return globals_
+
+
+# ===== PASS 2: SCORES AND TOP-N =====
+def _minmax(x, lo, hi):
+    """minmax() from the R script with global bounds; a constant metric scores 0.5"""
+    if lo is None:
+        return np.full(len(x), np.nan)
+    if lo == hi:
+        return np.full(len(x), 0.5)
+    return (x - lo) / (hi - lo)
+
+
+def score_block(metrics, g):
+    """GrowthScore, ResilienceScore and Investability for a block (R weights, median imputation)"""
+    def scaled(name, values, reverse=False, hi=None):
+        info = g[name]
+        top = info["max"] if hi is None else hi
+        s = _minmax(values, info["min"], top)
+        median = _minmax(np.array([info["median"]]), info["min"], top)[0] if info["median"] is not None else np.nan
+        if reverse:
+            s, median = 1 - s, 1 - median
+        return np.where(np.isnan(s), median, s)
+
+    recovery = metrics[:, 3]
+    rec_clean = np.where(np.isinf(recovery), g["recovery"].get("clean_max", np.nan), recovery)
+    s_cagr = scaled("cagr", metrics[:, 0])
+    s_vol = scaled("volatility", metrics[:, 1], reverse=True)
+    s_dd = scaled("max_dd", metrics[:, 2], reverse=True)
+    s_rec = scaled("recovery", rec_clean, reverse=True, hi=g["recovery"].get("clean_max"))
+    s_prod = scaled("prod_slope", metrics[:, 4])
+    if g["prod_slope"]["min"] is None:
+        s_prod = s_cagr  # no employment data: growth rests on CAGR alone
+    growth = 0.7 * s_cagr + 0.3 * s_prod
+    resilience = 0.5 * s_rec + 0.3 * s_vol + 0.2 * s_dd
+    investability = 0.6 * resilience + 0.4 * growth
+    return np.column_stack([growth, resilience, investability])
+
+
+def _block_top(values, offset, n, descending=True):
+    """(value, global index) of the block's n best non-missing entries"""
+    ok = np.flatnonzero(np.isfinite(values))
+    if len(ok) == 0:
+        return []
+    keyed = -values[ok] if descending else values[ok]
+    if len(ok) > n:
+        keep = np.argpartition(keyed, n - 1)[:n]
+        ok = ok[keep]
+    return [(float(values[i]), int(offset + i)) for i in ok]
+
+
+def _pass2_block(args):
+    workdir, k, start, globals_, top_n = args
+    metrics = np.load(os.path.join(workdir, f"metrics_{k:05d}.npy"))
+    composites = score_block(metrics, globals_)
+    np.save(os.path.join(workdir, f"composites_{k:05d}.npy"), composites.astype(np.float32))
+    result = {"min": np.nanmin(composites, axis=0).tolist(), "max": np.nanmax(composites, axis=0).tolist(),
+              "top": {}}
+    for name, (kind, column, direction) in RANKINGS.items():
+        source = composites[:, COMPOSITES.index(column)] if kind == "composite" else metrics[:, METRICS.index(column)]
+        result["top"][name] = _block_top(source, start, top_n, direction == "desc")
+    return result
+
+
+def _rescale(x, lo, hi, max_score):
+    """rescale01() from the R script with global bounds"""
+    if lo == hi:
+        return np.full(len(x), 50.0)
+    return max_score * (x - lo) / (hi - lo)
+
+
+def overall_scores(composites, lo, hi):
+    """Overall01 without the R script's name-hash jitter: 50% invest, 30% resilience, 20% growth"""
+    growth01 = _rescale(composites[:, 0], lo[0], hi[0], 82)
+    resilience01 = _rescale(composites[:, 1], lo[1], hi[1], 81)
+    invest01 = np.clip(_rescale(composites[:, 2], lo[2], hi[2], 83), 5, 90)
+    return np.clip((0.50 * invest01 + 0.30 * resilience01 + 0.20 * growth01) * 0.95, 10, 82)
+
+
+# ===== DRIVER =====
+def _map(fn, tasks, workers):
+    if workers < 1:
+        return [fn(task) for task in tasks]  # workers=0: inline, handy for profiling
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(fn, tasks))
+
+
+def run_panel(panel, workers=DEFAULT_SCALE_CONFIG["workers"], block_size=DEFAULT_SCALE_CONFIG["block_size"],
+              top_n=DEFAULT_SCALE_CONFIG["top_n"], shock_year=DEFAULT_SCALE_CONFIG["shock_year"],
+              train_end=DEFAULT_SCALE_CONFIG["train_end"], keep_workdir=False):
+    """Score every series of a panel; returns the rankings plus timing and memory figures"""
+    meta = load_meta(panel)
+    years = meta["years"]
+    n_series = np.load(os.path.join(panel, "values.npy"), mmap_mode="r").shape[0]
+    config = dict(DEFAULT_SCALE_CONFIG, shock_year=shock_year, train_end=train_end)
+    blocks = [(k, start, min(start + block_size, n_series)) for k, start in enumerate(range(0, n_series, block_size))]
+    workdir = tempfile.mkdtemp(prefix="scale_out_")
+    timings = {}
+    try:
+        started = time.perf_counter()
+        summaries = _map(_pass1_block, [(panel, workdir, k, a, b, years, config) for k, a, b in blocks], workers)
+        globals_ = merge_pass1(summaries)
+        timings["pass1"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = _map(_pass2_block, [(workdir, k, a, globals_, top_n) for k, a, _ in blocks], workers)
+        lo = np.nanmin([r["min"] for r in results], axis=0)
+        hi = np.nanmax([r["max"] for r in results], axis=0)
+        rankings = {}
+        for name, (_, _, direction) in RANKINGS.items():
+            candidates = [c for r in results for c in r["top"][name]]
+            pick = heapq.nlargest if direction == "desc" else heapq.nsmallest
+            rankings[name] = pick(top_n, candidates)
+        timings["pass2"] = time.perf_counter() - started
+
+        # Overall01 depends on the composite ranges: one streaming sweep over the stored columns
+        started = time.perf_counter()
+        heap = []
+        for k, start, _ in blocks:
+            overall = overall_scores(np.load(os.path.join(workdir, f"composites_{k:05d}.npy")), lo, hi)
+            for entry in _block_top(overall, start, top_n):
+                if len(heap) < top_n:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heappushpop(heap, entry)
+        rankings["overall"] = sorted(heap, reverse=True)
+        timings["select"] = time.perf_counter() - started
+
+        rows = {name: [_describe(workdir, panel_meta=meta, index=i, value=v, block_size=block_size)
+                       for v, i in entries] for name, entries in rankings.items()}
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    total = sum(timings.values())
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "panel": panel,
+        "source": meta.get("source"),
+        "series": int(n_series),
+        "years": [years[0], years[-1]],
+        "blocks": len(blocks),
+        "block_size": block_size,
+        "workers": workers,
+        "timings": timings,
+        "seconds": total,
+        "series_per_sec": n_series / total if total else 0.0,
+        "peak_rss_mb": self_usage.ru_maxrss / 1024,            # Linux reports KiB
+        "peak_worker_rss_mb": child_usage.ru_maxrss / 1024,    # largest reaped worker
+        "rankings": rows,
+    }
+
+
+def _describe(workdir, panel_meta, index, value, block_size):
+    k, offset = divmod(index, block_size)
+    metrics = np.load(os.path.join(workdir, f"metrics_{k:05d}.npy"), mmap_mode="r")[offset]
+    names = panel_meta.get("names")
+    row = {"series": names[index] if names else f"series {index:07d}", "index": index, "value": value}
+    row.update({name: float(metrics[j]) for j, name in enumerate(METRICS)})
+    return row
+
+
+# ===== REPORTING =====
+def _fmt(x, kind):
+    if x is None or np.isnan(x):
+        return "—"
+    if kind == "years":
+        return "Not yet" if np.isinf(x) else f"{x:.0f} yrs"
+    return f"{x:+.1%}" if kind == "pct" else f"{x:.1%}"
+
+
+def print_report(report, top=5):
+    print(f"🏭 {report['series']:,} series · {report['years'][0]}-{report['years'][1]} · "
+          f"{report['blocks']} blocks of {report['block_size']:,} · {report['workers']} worker(s)")
+    t = report["timings"]
+    print(f"Pass 1 {t['pass1']:.2f}s · pass 2 {t['pass2']:.2f}s · select {t['select']:.2f}s · "
+          f"{report['series_per_sec']:,.0f} series/s · peak RSS {report['peak_rss_mb']:.0f} MB "
+          f"(worker {report['peak_worker_rss_mb']:.0f} MB)\n")
+    for name in ["overall"] + list(RANKINGS):
+        print(f"{RANKING_TITLES[name]}:")
+        for i, row in enumerate(report["rankings"][name][:top], 1):
+            print(f"  {i:2d}. {row['series'][:48]:<48} {row['value']:9.4f}  CAGR {_fmt(row['cagr'], 'pct')} · "
+                  f"vol {_fmt(row['volatility'], 'abs')} · recovery {_fmt(row['recovery'], 'years')} · "
+                  f"MAPE {_fmt(row['mape'], 'abs')}")
+        print()
+
+
+# ===== BENCHMARK =====
+def run_benchmark(series_counts, worker_counts, block_size, cache_dir):
+    """Each configuration runs in a fresh process so its peak RSS is its own"""
+    results = []
+    for n in series_counts:
+        panel = os.path.join(cache_dir, f"synthetic_{n}")
+        if not os.path.exists(os.path.join(panel, "meta.json")):
+            print(f"Generating {n:,} synthetic series in {panel} ...", flush=True)
+            generate_panel(panel, n, block_size=block_size, workers=max(worker_counts))
+        for workers in worker_counts:
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+                out = f.name
+            subprocess.run([sys.executable, os.path.abspath(__file__), "run", panel, "--workers", str(workers),
+                            "--block-size", str(block_size), "--json", out, "--quiet"], check=True)
+            with open(out) as f:
+                report = json.load(f)
+            os.unlink(out)
+            report.pop("rankings")
+            results.append(report)
+            print(f"  {n:>9,} series · {workers} worker(s): {report['seconds']:.2f}s · "
+                  f"{report['series_per_sec']:,.0f} series/s", flush=True)
+    return results
+
+
+def print_benchmark(results):
+    print(f"\nCPU cores available: {os.cpu_count()}")
+    print(f"{'series':>10} {'workers':>8} {'seconds':>8} {'series/s':>11} {'pass1':>7} {'pass2':>7} "
+          f"{'select':>7} {'RSS MB':>7} {'worker MB':>10}")
+    for r in results:
+        t = r["timings"]
+        print(f"{r['series']:>10,} {r['workers']:>8} {r['seconds']:>8.2f} {r['series_per_sec']:>11,.0f} "
+              f"{t['pass1']:>7.2f} {t['pass2']:>7.2f} {t['select']:>7.2f} {r['peak_rss_mb']:>7.0f} "
+              f"{r['peak_worker_rss_mb']:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, multi-process scoring for large panels")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write a synthetic panel")
+    gen.add_argument("--series", type=int, required=True)
+    gen.add_argument("--out", required=True)
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--missing-rate", type=float, default=0.02)
+    gen.add_argument("--first-year", type=int, default=2012)
+    gen.add_argument("--last-year", type=int, default=2023)
+    gen.add_argument("--workers", type=int, default=DEFAULT_SCALE_CONFIG["workers"])
+
+    run = sub.add_parser("run", help="score a panel directory (or the BEA workbook)")
+    run.add_argument("panel", nargs="?")
+    run.add_argument("--workbook", help="convert this BEA workbook and score it")
+    run.add_argument("--workers", type=int, default=DEFAULT_SCALE_CONFIG["workers"])
+    run.add_argument("--block-size", type=int, default=DEFAULT_SCALE_CONFIG["block_size"])
+    run.add_argument("--top", type=int, default=DEFAULT_SCALE_CONFIG["top_n"])
+    run.add_argument("--shock-year", type=int, default=DEFAULT_SCALE_CONFIG["shock_year"])
+    run.add_argument("--train-end", type=int, default=DEFAULT_SCALE_CONFIG["train_end"])
+    run.add_argument("--json", help="write the full report to this file")
+    run.add_argument("--quiet", action="store_true")
+
+    bench = sub.add_parser("benchmark", help="throughput and peak RSS vs series and worker count")
+    bench.add_argument("--series", type=int, nargs="+", default=[10000, 100000, 1000000])
+    bench.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    bench.add_argument("--block-size", type=int, default=DEFAULT_SCALE_CONFIG["block_size"])
+    bench.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "space_scale_out"))
+    bench.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_panel(args.out, args.series, range(args.first_year, args.last_year + 1), seed=args.seed,
+                       missing_rate=args.missing_rate, workers=args.workers)
+        print(f"Wrote {args.series:,} series to {args.out}")
+    elif args.command == "run":
+        panel = args.panel
+        if args.workbook:
+            panel = panel_from_workbook(panel or tempfile.mkdtemp(prefix="bea_panel_"), args.workbook)
+        elif not panel:
+            parser.error("give a panel directory or --workbook")
+        report = run_panel(panel, args.workers, args.block_size, args.top, args.shock_year, args.train_end)
+        if not args.quiet:
+            print_report(report, args.top)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2, default=float)
+    else:
+        results = run_benchmark(args.series, args.workers, args.block_size, args.cache_dir)
+        print_benchmark(results)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
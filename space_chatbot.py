@@ -4,230 +4,112 @@ Uses BEA space economy data analysis for investment insights + Local LLM for con
 """
 
 import streamlit as st
-import pandas as pd
-import json
-import re
 import subprocess
 import os
 from datetime import datetime
-import time
+import uuid
 import requests
+from llm_scheduler import (
+    get_scheduler, SchedulerRejected, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+from knowledge_index import get_index, index_sources, source_fingerprint
+from answer_cache import get_answer_cache
+from llm_backends import get_backend, LLMBackendError
+from conversation_memory import ConversationMemory, DEFAULT_MEMORY_CONFIG
+from question_patterns import parse_portfolio_request, shock_windows
+# event_study / portfolio (numpy + the BEA panel) are imported only when a question is routed to them
 
 # ===== LOCAL LLM CONFIGURATION =====
 # Configure your local LLM settings here
 LOCAL_LLM_CONFIG = {
-    "url": "http://localhost:11434/api/generate",  # Ollama default
+    "api_type": os.environ.get("LOCAL_LLM_API", "ollama"),  # ollama | openai | llamacpp (see llm_backends.py)
+    "url": os.environ.get("LOCAL_LLM_URL", "http://localhost:11434/api/generate"),  # Ollama default
     "model": "llama3.2:3b",  # Available: llama3.2:3b (fast), llama3:latest (larger)
     "timeout": 30,  # Request timeout in seconds
     "temperature": 0.7,  # Response creativity (0.0-2.0)
-    "max_tokens": 1000  # Maximum response length
+    "max_tokens": 1000,  # Maximum response length (sent as num_predict / max_tokens / n_predict)
+    "context_tokens": 400,  # Budget for retrieved analysis rows in each prompt
+    "history_tokens": 300  # Budget for conversation memory in each prompt
 }
 
-# Alternative configurations (uncomment the one you want to use):
+# Alternative backends (set api_type/url/model above, or LOCAL_LLM_API / LOCAL_LLM_URL):
 # For OpenAI-compatible APIs (like LM Studio):
-# LOCAL_LLM_CONFIG = {
-#     "url": "http://localhost:1234/v1/chat/completions",
-#     "model": "local-model",
-#     "api_type": "openai"
-# }
+#     "api_type": "openai", "url": "http://localhost:1234/v1/chat/completions", "model": "local-model"
+# For a llama.cpp server:
+#     "api_type": "llamacpp", "url": "http://localhost:8080/completion"
+# Compare backends/models with: python llm_backends.py benchmark
+
+# Shared request scheduler in front of the local LLM (one per server process);
+# tune DEFAULT_SCHEDULER_CONFIG in llm_scheduler.py
+
+# Sidebar status checks (LLM health, analysis file) are shared by all sessions
+# and refreshed at most this often, instead of on every rerun
+STATUS_REFRESH_SECONDS = 15
+
+# Sample queries advertised in the welcome message and README. Their answers (and the
+# sidebar actions') are generated in the background whenever a new analysis version is
+# published and served from answer_cache.py until the data changes again.
+SUGGESTED_QUERIES = [
+    "What are the best space investment opportunities?",
+    "Which sectors survived COVID-19 best?",
+    "Show me growth trends in the space economy",
+    "Which sectors were most resilient to the 2013 shock?",
+    "Build me a diversified portfolio with at most 20% per sector",
+    "What makes a good space investment?",
+    "Tell me about the space economy trends",
+    "Which sectors should I avoid?",
+]
+ANALYSIS_COMPLETE_MARKER = "Analysis completed successfully!"  # last line data_analysis_clean.r writes
 
-# For other local APIs:
-# LOCAL_LLM_CONFIG = {
-#     "url": "http://localhost:8080/generate",
-#     "model": "your-model-name"
-# }
+# Sidebar quick actions: (button key, label, chat message, bot method, method argument)
+SIDEBAR_ACTIONS = [
+    ("fresh_analysis", "Run Analysis", "Run fresh space economy analysis", "run_fresh_analysis", "run analysis"),
+    ("investments", "Top Investment Picks", "Show me top investment picks", "investment_advice_with_data", "investment advice"),
+    ("growth", "Growth Leaders", "Show me growth leaders", "growth_analysis_with_data", "growth trends"),
+    ("resilience", "Resilient Sectors", "Show me resilient sectors", "resilience_insights_with_data", "resilience analysis"),
+    ("portfolio", "Diversified Portfolio", "Build me a diversified portfolio", "portfolio_advice", None),
+    ("forecast", "Market Forecast", "Show me market forecast", "forecast_insights_with_data", "forecast analysis"),
+]
 # ===================================
 
-# Page config
+
+class LLMFailure(str):
+    """Message shown when the local LLM gave no answer (offline, busy, backend error).
+    Callers test isinstance(response, LLMFailure), never the text, so real answers
+    that happen to mention "Error" are not mistaken for failures"""
+
+
+# Page config (a Material icon: an emoji icon loads Streamlit's whole emoji table on cold start)
 st.set_page_config(
     page_title="🚀 Space Economy Investment Advisor",
-    page_icon="🛰️",
+    page_icon=":material/satellite_alt:",
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
-# Enhanced space theme CSS with animations
-st.markdown("""
-<style>
-    .stApp {
-        background: linear-gradient(135deg, #0a0a0a 0%, #1a1a2e 25%, #16213e 50%, #0f3460 75%, #000000 100%);
-        color: #ffffff;
-        font-family: Arial, sans-serif;
-    }
-    
-    .main-header {
-        background: linear-gradient(90deg, #00bcd4, #2196f3, #9c27b0);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        text-shadow: 0 0 30px #00bcd4;
-        animation: glow 2s ease-in-out infinite alternate;
-    }
-    
-    @keyframes glow {
-        from { text-shadow: 0 0 20px #00bcd4, 0 0 30px #00bcd4, 0 0 40px #00bcd4; }
-        to { text-shadow: 0 0 30px #00bcd4, 0 0 40px #00bcd4, 0 0 50px #00bcd4; }
-    }
-    
-    .stTitle {
-        color: #00bcd4 !important;
-        font-family: Arial, sans-serif !important;
-        font-weight: 900 !important;
-        text-shadow: 0 0 20px #00bcd4 !important;
-    }
-    
-    .stHeader {
-        color: #64b5f6 !important;
-        font-family: Arial, sans-serif !important;
-        font-weight: 700 !important;
-    }
-    
-    .stTextInput > div > div > input {
-        background-color: rgba(0, 188, 212, 0.1) !important;
-        color: white !important;
-        border: 2px solid #00bcd4 !important;
-        border-radius: 10px !important;
-        font-family: Arial, sans-serif !important;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #2196f3 !important;
-        box-shadow: 0 0 15px #00bcd4 !important;
-    }
-    
-    .stButton > button {
-        background: linear-gradient(45deg, #1976d2, #00bcd4, #9c27b0) !important;
-        border: none !important;
-        color: white !important;
-        font-weight: bold !important;
-        font-family: Arial, sans-serif !important;
-        border-radius: 25px !important;
-        padding: 0.5rem 1.5rem !important;
-        transition: all 0.3s ease !important;
-        position: relative !important;
-        overflow: hidden !important;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(45deg, #0d47a1, #006064, #6a1b9a) !important;
-        box-shadow: 0 0 25px #00bcd4 !important;
-        transform: translateY(-2px) !important;
-    }
-    
-    .stButton > button:before {
-        content: '' !important;
-        position: absolute !important;
-        top: 0 !important;
-        left: -100% !important;
-        width: 100% !important;
-        height: 100% !important;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent) !important;
-        transition: left 0.5s !important;
-    }
-    
-    .stButton > button:hover:before {
-        left: 100% !important;
-    }
-    
-    .chat-message {
-        padding: 1.5rem !important;
-        border-radius: 15px !important;
-        margin: 1rem 0 !important;
-        border-left: 5px solid #00bcd4 !important;
-        background: rgba(0, 188, 212, 0.05) !important;
-        backdrop-filter: blur(10px) !important;
-        box-shadow: 0 8px 32px rgba(0, 188, 212, 0.1) !important;
-        animation: slideIn 0.5s ease-out !important;
-    }
-    
-    @keyframes slideIn {
-        from { opacity: 0; transform: translateX(-20px); }
-        to { opacity: 1; transform: translateX(0); }
-    }
-    
-    .user-message {
-        background: rgba(0, 188, 212, 0.1) !important;
-        border-left-color: #2196f3 !important;
-    }
-    
-    .bot-message {
-        background: rgba(100, 181, 246, 0.1) !important;
-        border-left-color: #00bcd4 !important;
-    }
-    
-    .sidebar-content {
-        background: rgba(0, 0, 0, 0.3) !important;
-        border-radius: 15px !important;
-        padding: 1rem !important;
-        margin: 1rem 0 !important;
-        backdrop-filter: blur(10px) !important;
-    }
-    
-    .space-particles {
-        position: fixed !important;
-        top: 0 !important;
-        left: 0 !important;
-        width: 100% !important;
-        height: 100% !important;
-        pointer-events: none !important;
-        z-index: -1 !important;
-    }
-    
-    .particle {
-        position: absolute !important;
-        background: white !important;
-        border-radius: 50% !important;
-        animation: float 6s ease-in-out infinite !important;
-    }
-    
-    @keyframes float {
-        0%, 100% { transform: translateY(0px) rotate(0deg); opacity: 0; }
-        50% { transform: translateY(-20px) rotate(180deg); opacity: 1; }
-    }
-    
-    .metric-card {
-        background: rgba(0, 188, 212, 0.1) !important;
-        border: 1px solid #00bcd4 !important;
-        border-radius: 10px !important;
-        padding: 1rem !important;
-        margin: 0.5rem 0 !important;
-        text-align: center !important;
-    }
-    
-    .metric-value {
-        font-size: 2rem !important;
-        font-weight: 900 !important;
-        color: #00bcd4 !important;
-        font-family: Arial, sans-serif !important;
-    }
-    
-    .metric-label {
-        font-size: 0.9rem !important;
-        color: #64b5f6 !important;
-        font-family: Arial, sans-serif !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+THEME_CSS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'space_theme.css')
+PARTICLES_HTML = '<div class="space-particles">' + '<div class="particle"></div>' * 9 + '</div>'
 
-# Add space particles background
-st.markdown("""
-<div class="space-particles">
-    <div class="particle" style="left: 10%; animation-delay: 0s; width: 2px; height: 2px;"></div>
-    <div class="particle" style="left: 20%; animation-delay: 1s; width: 1px; height: 1px;"></div>
-    <div class="particle" style="left: 30%; animation-delay: 2s; width: 3px; height: 3px;"></div>
-    <div class="particle" style="left: 40%; animation-delay: 0.5s; width: 1px; height: 1px;"></div>
-    <div class="particle" style="left: 50%; animation-delay: 1.5s; width: 2px; height: 2px;"></div>
-    <div class="particle" style="left: 60%; animation-delay: 3s; width: 1px; height: 1px;"></div>
-    <div class="particle" style="left: 70%; animation-delay: 0.8s; width: 2px; height: 2px;"></div>
-    <div class="particle" style="left: 80%; animation-delay: 2.5s; width: 1px; height: 1px;"></div>
-    <div class="particle" style="left: 90%; animation-delay: 1.2s; width: 3px; height: 3px;"></div>
-</div>
-""", unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def theme_html():
+    """Space theme + particle layer. With static serving on (.streamlit/config.toml) the CSS
+    is a cached stylesheet link; otherwise it is inlined as before"""
+    if st.get_option("server.enableStaticServing"):
+        version = int(os.path.getmtime(THEME_CSS))
+        return f'<link rel="stylesheet" href="app/static/space_theme.css?v={version}">' + PARTICLES_HTML
+    with open(THEME_CSS) as f:
+        return f"<style>{f.read()}</style>" + PARTICLES_HTML
+
+# Enhanced space theme with animations (static/space_theme.css)
+st.markdown(theme_html(), unsafe_allow_html=True)
 
 class SpaceEconomyBot:
     def __init__(self):
         self.analysis_tools = self.setup_analysis_tools()
         self.llm_config = LOCAL_LLM_CONFIG
+        self.backend = get_backend(LOCAL_LLM_CONFIG)
+        self.scheduler = get_scheduler()
+        self.warmed_at = None  # analysis_updated_at() value the last warm-up check ran for
         
     def setup_analysis_tools(self):
         """Setup available analysis tools from your R script"""
@@ -235,7 +117,7 @@ class SpaceEconomyBot:
             'run_full_analysis': {
                 'description': 'Run the complete space economy analysis using BEA data',
                 'command': 'Rscript data_analysis_clean.r',
-                'output_files': ['analysis_results.txt', 'top5_industries_plot.png', 'shock_resilience_plot.png', 'investability_quadrant_plot.png']
+                'output_files': ['analysis_results.txt', 'industry_metrics.csv', 'top5_industries_plot.png', 'shock_resilience_plot.png', 'investability_quadrant_plot.png']
             },
             'get_current_results': {
                 'description': 'Read existing analysis results',
@@ -401,38 +283,45 @@ class SpaceEconomyBot:
         
         return results
     
-    def query_local_llm(self, prompt, system_prompt=""):
-        """Query the local LLM with a prompt"""
+    def query_local_llm(self, prompt, system_prompt="", session_id="default", priority=PRIORITY_INTERACTIVE,
+                        on_token=None):
+        """Query the local LLM through the shared scheduler; on_token(chunk) streams the reply"""
+        priority = self.scheduler.classify(prompt, priority)
         try:
-            payload = {
-                "model": self.llm_config["model"],
-                "prompt": f"{system_prompt}\n\nUser: {prompt}\nAssistant:",
-                "stream": False,
-                "options": {
-                    "temperature": self.llm_config.get("temperature", 0.7),
-                    "max_tokens": self.llm_config.get("max_tokens", 1000)
-                }
-            }
-            
-            response = requests.post(
-                self.llm_config["url"],
-                json=payload,
-                timeout=self.llm_config.get("timeout", 30)
+            return self.scheduler.run(
+                lambda: self._post_local_llm(prompt, system_prompt, on_token),
+                session_id=session_id,
+                priority=priority
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', 'No response from LLM')
-            else:
-                return f"LLM Error: {response.status_code}"
-                
+        except SchedulerRejected as e:
+            return LLMFailure(f"🤖 **Local LLM busy**\n\n{e}. Please try again in a moment.")
+    
+    def _post_local_llm(self, prompt, system_prompt="", on_token=None):
+        """Send a single request to the configured LLM backend"""
+        try:
+            response = self.backend.generate(prompt, system_prompt, on_token=on_token)
+        except requests.exceptions.HTTPError as e:
+            return LLMFailure(f"LLM Error: {e.response.status_code}")
+        except LLMBackendError as e:
+            return LLMFailure(f"LLM Error: {e}")
         except requests.exceptions.ConnectionError:
-            return f"🤖 **Local LLM not available**\n\nPlease start your local LLM:\n• **Ollama:** `ollama serve` then `ollama run {self.llm_config['model']}`\n• **LM Studio:** Start the local server\n• **Other:** Make sure your LLM is running on {self.llm_config['url']}"
+            return LLMFailure(f"🤖 **Local LLM not available**\n\nPlease start your local LLM:\n• **Ollama:** `ollama serve` then `ollama run {self.llm_config['model']}`\n• **LM Studio:** Start the local server\n• **Other:** Make sure your LLM is running on {self.llm_config['url']}")
         except Exception as e:
-            return f"Error connecting to local LLM: {str(e)}"
-    
-    def get_analysis_context(self):
-        """Get current analysis data as context for the LLM"""
+            return LLMFailure(f"Error connecting to local LLM: {str(e)}")
+        return response if response else LLMFailure("LLM Error: empty response")
+    
+    def get_analysis_context(self, question=""):
+        """Get the analysis rows most relevant to the question as context for the LLM"""
+        index = get_index(self.read_analysis_results)
+        rows = index.select(question, token_budget=self.llm_config.get("context_tokens", 400))
+        
+        if rows:
+            context = "RELEVANT SPACE ECONOMY ANALYSIS DATA:\n\n"
+            for row in rows:
+                context += f"• {row}\n"
+            return context
+        
+        # Nothing specific matched: fall back to a short overview
         results = self.read_analysis_results()
         
         if isinstance(results, dict):
@@ -440,26 +329,24 @@ class SpaceEconomyBot:
             
             if results.get('top_investments'):
                 context += "TOP INVESTMENT OPPORTUNITIES:\n"
-                for i, inv in enumerate(results['top_investments'][:5], 1):
+                for i, inv in enumerate(results['top_investments'][:3], 1):
                     context += f"{i}. {inv['industry']} (Overall: {inv['overall_score']}, Growth: {inv['growth']}, Resilience: {inv['resilience']})\n"
                 context += "\n"
             
             if results.get('resilient_sectors'):
                 context += "MOST RESILIENT SECTORS (2020 Shock):\n"
-                for i, sector in enumerate(results['resilient_sectors'][:5], 1):
+                for i, sector in enumerate(results['resilient_sectors'][:3], 1):
                     context += f"{i}. {sector['industry']} (Resilience Score: {sector['score']})\n"
                 context += "\n"
             
-            if results.get('forecast_results', {}).get('best_predictable'):
-                context += "MOST PREDICTABLE SECTORS (Low MAPE):\n"
-                for pred in results['forecast_results']['best_predictable'][:3]:
-                    context += f"• {pred['industry']} (MAPE: {pred['mape']})\n"
-                context += "\n"
-            
             return context
         else:
             return "No analysis data available. User should run fresh analysis first."
     
+    def known_industries(self):
+        """Industry names in the current knowledge base (used for conversation focus)"""
+        return [doc.industry for doc in get_index(self.read_analysis_results).documents]
+    
     def categorize_question(self, question):
         """Determine if question needs analysis tools or general conversation"""
         question_lower = question.lower()
@@ -479,27 +366,59 @@ class SpaceEconomyBot:
         else:
             return 'conversation'
     
-    def generate_response(self, question):
-        """Generate response using local LLM with analysis data context"""
+    def wants_fresh_analysis(self, question):
+        """True if the question asks to (re)run the R analysis"""
+        return any(word in question.lower() for word in ['run', 'analyze', 'fresh', 'new', 'update', 'calculate'])
+    
+    def generate_response(self, question, session_id="default", memory=None,
+                          priority=PRIORITY_INTERACTIVE, fallback=True, use_cache=True, on_token=None):
+        """Generate response using local LLM with analysis data and conversation context.
+        With fallback=False, returns None instead of a canned answer when the LLM fails.
+        on_token(chunk) is called as LLM tokens arrive; the return value is still the full answer"""
         category = self.categorize_question(question)
         
         # Check for specific analysis requests
-        if any(word in question.lower() for word in ['run', 'analyze', 'fresh', 'new', 'update', 'calculate']):
+        if self.wants_fresh_analysis(question):
             return self.run_fresh_analysis(question)
         
+        # Suggested queries are served from the warm cache while the data is unchanged
+        if use_cache:
+            cached = self.cached_answer(question)
+            if cached:
+                return cached
+        
+        # "Most resilient to shock year X" is answered straight from the event-study matrix
+        shock_answer = self.shock_window_answer(question)
+        if shock_answer:
+            return shock_answer
+        
+        # Portfolio / allocation questions go straight to the optimizer
+        portfolio_request = parse_portfolio_request(question)
+        if portfolio_request:
+            return self.portfolio_advice(**portfolio_request)
+        
+        # Resolve follow-ups ("and its resilience?") against the industries in focus
+        retrieval_query = question
+        conversation = ""
+        if memory is not None:
+            retrieval_query = memory.expand_query(question, self.known_industries())
+            conversation = memory.render(self.llm_config.get("history_tokens", 300))
+        
         # Get current analysis context
-        analysis_context = self.get_analysis_context()
+        analysis_context = self.get_analysis_context(retrieval_query)
         
         # Create system prompt for the LLM
         system_prompt = f"""You are a Space Economy Investment Advisor AI assistant. You have access to real Bureau of Economic Analysis (BEA) space economy data from 2012-2023.
 
 {analysis_context}
-
+{conversation}
 Your role:
 - Provide conversational, helpful responses about space economy investments
 - Use the analysis data above to answer questions with specific numbers and rankings
+- The data above is the subset most relevant to the question; do not invent figures for industries not listed
 - Be friendly and engaging while being professional
 - If asked about investments, resilience, growth, or forecasts, refer to the specific data above
+- Use the conversation so far to resolve follow-up questions about the industries in focus
 - If the user needs fresh analysis, suggest they ask to "run fresh analysis"
 - Keep responses concise but informative
 - Do NOT use emojis in your responses - use plain text only
@@ -507,10 +426,13 @@ Your role:
 Remember: You are a space economy expert with access to real government data analysis."""
 
         # Query the local LLM
-        response = self.query_local_llm(question, system_prompt)
+        response = self.query_local_llm(question, system_prompt, session_id=session_id, priority=priority,
+                                        on_token=on_token)
         
-        # If LLM fails, fall back to analysis-specific methods
-        if "LLM not available" in response or "Error" in response:
+        # If LLM fails or is overloaded, fall back to analysis-specific methods
+        if isinstance(response, LLMFailure):
+            if not fallback:
+                return None
             if category == 'analysis':
                 if 'investment' in question.lower():
                     return self.investment_advice_with_data(question)
@@ -527,6 +449,93 @@ Remember: You are a space economy expert with access to real government data ana
         
         return response
     
+    def shock_window_answer(self, question):
+        """Answer shock-resilience questions that name a year or window, without the LLM"""
+        windows = shock_windows(question)
+        if not windows:
+            return None
+        from event_study import get_event_study, format_window, window_label, DEFAULT_EXTRA_WINDOWS
+        try:
+            study = get_event_study(DEFAULT_EXTRA_WINDOWS + windows)
+        except Exception:
+            return None  # no workbook / store: let the LLM path handle it
+        answers = []
+        for window in windows:
+            if window in study.windows:
+                answers.append(format_window(study, window))
+            else:
+                answers.append(
+                    f"🛡️ No shock analysis for {window_label(window)}: a shock needs a baseline year before it, "
+                    f"and the data covers {study.years[0]}-{study.years[-1]}."
+                )
+        return "\n\n".join(answers)
+    
+    def portfolio_advice(self, strategies=None, frontier=True, max_weight=None, resilient_share=None):
+        """Diversified allocations from the sector covariance model"""
+        from portfolio import get_return_model, format_report, STRATEGIES
+        try:
+            model = get_return_model()
+        except Exception as e:
+            return f"📈 Portfolio model unavailable: {e}\n\nMake sure Business.xlsx is in the app folder."
+        try:
+            return format_report(model, tuple(STRATEGIES) if strategies is None else strategies,
+                                 max_weight=max_weight, resilient_share=resilient_share, frontier=frontier)
+        except ValueError as e:
+            return f"📈 Those constraints cannot be met: {e}. Try a higher max weight or a lower resilient share."
+    
+    def sidebar_answer(self, method, argument=None):
+        """Run one of the SIDEBAR_ACTIONS bot methods"""
+        answer = getattr(self, method)
+        return answer() if argument is None else answer(argument)
+    
+    # ---------- ANSWER WARM-UP ----------
+    def data_version(self):
+        """Changes whenever the analysis outputs or the BEA panel change (cheap: file stats)"""
+        from panel_store import panel_version
+        try:
+            panel = panel_version()
+        except Exception:
+            panel = None  # no workbook / store
+        return (source_fingerprint(index_sources()), panel)
+    
+    def analysis_complete(self):
+        """True once analysis_results.txt has been written through to the end"""
+        try:
+            with open('analysis_results.txt', 'r') as f:
+                return ANALYSIS_COMPLETE_MARKER in f.read()
+        except OSError:
+            return False
+    
+    def cached_answer(self, question):
+        """Warm answer for a suggested query or sidebar action, or None"""
+        return get_answer_cache().get(self.data_version(), question)
+    
+    def warmup_jobs(self):
+        """(query, generate) pairs: the sidebar actions (no LLM) first, then the suggested queries"""
+        jobs = [
+            (question, lambda method=method, argument=argument: self.sidebar_answer(method, argument))
+            for key, _, question, method, argument in SIDEBAR_ACTIONS if key != "fresh_analysis"
+        ]
+        jobs += [
+            (query, lambda query=query: self.generate_response(
+                query, session_id="warmup", priority=PRIORITY_BATCH, fallback=False, use_cache=False))
+            for query in SUGGESTED_QUERIES if not self.wants_fresh_analysis(query)
+        ]
+        return jobs
+    
+    def warm_answers(self, updated_at=None):
+        """Start the background warm-up if a new, complete analysis version is out.
+        With updated_at (the cached analysis_updated_at() value), nothing is checked unless it
+        changed since the last check or unanswered queries are due for a retry"""
+        cache = get_answer_cache()
+        if updated_at is not None and updated_at == self.warmed_at and not cache.retry_due():
+            return False
+        self.warmed_at = updated_at  # a half-written file gets a new mtime when the R script finishes
+        version = self.data_version()
+        if version != cache.version and not self.analysis_complete():
+            return False  # no results yet, or the R script is still writing them
+        return cache.warm(version, self.warmup_jobs())
+    
     def run_fresh_analysis(self, question):
         """Run fresh analysis using R script"""
         st.info("🔄 Running fresh space economy analysis...")
@@ -537,6 +546,9 @@ Remember: You are a space economy expert with access to real government data ana
         if isinstance(results, str) and "Error" in results:
             return f"❌ Analysis failed: {results}\n\nUsing cached data instead."
         
+        # New analysis version: pre-generate the suggested answers in the background
+        self.warm_answers()
+        
         response = "✅ **Fresh Analysis Complete!**\n\n"
         response += "�� I've just analyzed the latest BEA space economy data (2012-2023) using your R analysis script.\n\n"
         
@@ -791,14 +803,53 @@ Remember: You are a space economy expert with access to real government data ana
         
         return response
 
+@st.cache_resource(show_spinner=False)
+def get_bot():
+    """One bot per server process; it holds no per-session state (memory lives in session_state)"""
+    return SpaceEconomyBot()
+
+@st.cache_data(ttl=STATUS_REFRESH_SECONDS, show_spinner=False)
+def llm_online():
+    return get_bot().backend.health_check()
+
+@st.cache_data(ttl=STATUS_REFRESH_SECONDS, show_spinner=False)
+def analysis_updated_at():
+    """mtime of analysis_results.txt, or None if there are no results yet"""
+    try:
+        return os.path.getmtime('analysis_results.txt')
+    except OSError:
+        return None
+
+def remember_exchange(question, response):
+    """Fold an exchange into the session's bounded conversation memory"""
+    st.session_state.memory.add_exchange(question, response, st.session_state.bot.known_industries())
+
+def run_sidebar_action(key, question, method, argument):
+    """Button callback: answers before the script reruns, so a click costs one run instead of two"""
+    bot = st.session_state.bot
+    st.session_state.messages.append({"role": "user", "content": question})
+    response = bot.cached_answer(question) or bot.sidebar_answer(method, argument)
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    remember_exchange(question, response)
+    if key == "fresh_analysis":
+        analysis_updated_at.clear()
+
 def main():
     # Main header with enhanced space theme
     st.markdown('<h1 class="main-header">🚀 Space Economy Investment Advisor</h1>', unsafe_allow_html=True)
     st.markdown("*Your AI guide to space industry investment opportunities*")
     
-    # Initialize bot
+    # Stable id used by the LLM scheduler for per-session fair queuing
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    
+    # Shared bot (built once per server process)
     if 'bot' not in st.session_state:
-        st.session_state.bot = SpaceEconomyBot()
+        st.session_state.bot = get_bot()
+    
+    # Bounded conversation memory (recent turns + rolling summary + focus entities)
+    if 'memory' not in st.session_state:
+        st.session_state.memory = ConversationMemory(**DEFAULT_MEMORY_CONFIG)
     
     # Initialize chat history
     if 'messages' not in st.session_state:
@@ -827,71 +878,68 @@ def main():
             
             # Generate and add assistant response
             with st.chat_message("assistant"):
+                # LLM tokens are shown as they arrive; the finished answer then replaces them.
+                # A rerun/stop raised while drawing a token ends the call; the scheduler frees its slot
+                placeholder = st.empty()
+                streamed = []
+                
+                def show_token(chunk):
+                    streamed.append(chunk)
+                    placeholder.markdown("".join(streamed) + "▌")
+                
                 with st.spinner("Analyzing space economy data..."):
-                    response = st.session_state.bot.generate_response(prompt)
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    response = st.session_state.bot.generate_response(
+                        prompt,
+                        session_id=st.session_state.session_id,
+                        memory=st.session_state.memory,
+                        on_token=show_token
+                    )
+                placeholder.markdown(response)
+                st.session_state.messages.append({"role": "assistant", "content": response})
+                remember_exchange(prompt, response)
     
     with col2:
         # Enhanced sidebar with space theme
         st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
         st.markdown("### Analysis Tools")
         
-        # Quick action buttons with proper handling
-        if st.button("Run Analysis", key="fresh_analysis", use_container_width=True):
-            st.session_state.messages.append({"role": "user", "content": "Run fresh space economy analysis"})
-            with st.spinner("Running R analysis..."):
-                response = st.session_state.bot.run_fresh_analysis("run analysis")
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.rerun()
-        
-        if st.button("Top Investment Picks", key="investments", use_container_width=True):
-            st.session_state.messages.append({"role": "user", "content": "Show me top investment picks"})
-            response = st.session_state.bot.investment_advice_with_data("investment advice")
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.rerun()
-        
-        if st.button("Growth Leaders", key="growth", use_container_width=True):
-            st.session_state.messages.append({"role": "user", "content": "Show me growth leaders"})
-            response = st.session_state.bot.growth_analysis_with_data("growth trends")
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.rerun()
-        
-        if st.button("Resilient Sectors", key="resilience", use_container_width=True):
-            st.session_state.messages.append({"role": "user", "content": "Show me resilient sectors"})
-            response = st.session_state.bot.resilience_insights_with_data("resilience analysis")
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.rerun()
-        
-        if st.button("Market Forecast", key="forecast", use_container_width=True):
-            st.session_state.messages.append({"role": "user", "content": "Show me market forecast"})
-            response = st.session_state.bot.forecast_insights_with_data("forecast analysis")
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.rerun()
+        # Quick action buttons (answered in on_click callbacks, no extra st.rerun)
+        for key, label, question, method, argument in SIDEBAR_ACTIONS:
+            st.button(label, key=key, use_container_width=True, on_click=run_sidebar_action,
+                      args=(key, question, method, argument))
         
         st.markdown("---")
         
-        # LLM Status
+        # LLM Status (health check cached for STATUS_REFRESH_SECONDS across sessions)
         st.markdown("### AI Status")
-        try:
-            # Quick test of LLM availability
-            test_response = requests.get(st.session_state.bot.llm_config["url"].replace("/api/generate", ""), timeout=2)
-            if test_response.status_code == 200:
-                st.success(f"Local LLM Connected")
-                st.caption(f"Model: {st.session_state.bot.llm_config['model']}")
-            else:
-                st.warning("LLM Connection Issues")
-        except:
+        if llm_online():
+            st.success(f"Local LLM Connected")
+            st.caption(f"Model: {st.session_state.bot.llm_config['model']} ({st.session_state.bot.backend.api_type})")
+        else:
             st.error("Local LLM Offline")
             st.caption("Start Ollama or your local LLM")
         
+        # Shared LLM queue (all sessions in this server process)
+        queue_stats = st.session_state.bot.scheduler.metrics()
+        st.caption(
+            f"Queue: {queue_stats['queue_depth']}/{queue_stats['max_queue']} waiting · "
+            f"{queue_stats['in_flight']}/{queue_stats['max_in_flight']} in flight · "
+            f"p95 wait {queue_stats['wait_p95']:.1f}s"
+        )
+        if queue_stats['rejected'] or queue_stats['timed_out']:
+            st.caption(f"Shed: {queue_stats['rejected']} rejected · {queue_stats['timed_out']} timed out")
+        
         st.markdown("---")
         
         # Analysis status with enhanced styling
-        if os.path.exists('analysis_results.txt'):
+        mod_time = analysis_updated_at()
+        if mod_time is not None:
             st.success("Analysis Results Available")
-            mod_time = os.path.getmtime('analysis_results.txt')
             st.caption(f"Last updated: {datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d %H:%M')}")
+            warm = get_answer_cache().metrics()
+            if warm['queries']:
+                st.caption(f"Suggested answers: {warm['answers']}/{warm['queries']} ready"
+                           + (" · warming up" if warm['warming'] else ""))
         else:
             st.warning("No analysis results found")
             st.caption("Click 'Run Fresh Analysis' to generate")
@@ -902,6 +950,11 @@ def main():
         st.markdown("**Analysis Period:** 12 years of space economy data")
         
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Kicked off once the page has been drawn, so the first render never waits on it.
+    # Results written outside the app (e.g. Rscript from a shell) are warmed up too
+    if mod_time is not None:
+        st.session_state.bot.warm_answers(updated_at=mod_time)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,184 @@
+"""
+🧪 Stub LLM server for offline load testing
+Answers Ollama (/api/generate), OpenAI-compatible (/v1/chat/completions) and
+llama.cpp (/completion) requests with a configurable time-to-first-token, token
+rate and number of parallel slots, so the app can be exercised without a model.
+
+Usage:
+    python stub_llm_server.py --port 11435 --latency 0.3 --tokens-per-sec 40 --parallel 1
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_STUB_CONFIG = {
+    "latency": 0.3,          # seconds before the first token
+    "tokens_per_sec": 40.0,  # generation speed once started
+    "tokens": 120,           # natural response length (capped by the request's token limit)
+    "parallel": 1,           # concurrent generations (like OLLAMA_NUM_PARALLEL)
+}
+
+STUB_WORDS = ("The space economy data shows steady growth in this sector with solid "
+              "resilience and predictable forecast performance ").split()
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, StubHandler)
+        self.config = dict(DEFAULT_STUB_CONFIG)
+        self.config.update(config or {})
+        self.slots = threading.Semaphore(max(1, int(self.config["parallel"])))
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "tokens": 0, "busy_time": 0.0}
+
+    @property
+    def url(self):
+        """Ollama-style endpoint; the OpenAI and llama.cpp paths are served too"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path in ("/", "/api/version", "/health", "/v1/models"):
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid json"})
+            return
+        if self.path not in ("/api/generate", "/v1/chat/completions", "/completion"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        config = self.server.config
+        options = payload.get("options") or {}
+        limit = options.get("num_predict") or payload.get("max_tokens") or payload.get("n_predict")
+        # "tokens" is the natural answer length; the request's limit can only cut it short
+        n_tokens = min(int(limit), config["tokens"]) if limit else config["tokens"]
+        words = [STUB_WORDS[i % len(STUB_WORDS)] + " " for i in range(n_tokens)]
+        # Ollama streams by default; the OpenAI and llama.cpp APIs only when asked
+        stream = payload.get("stream", self.path == "/api/generate")
+
+        with self.server.slots:
+            started = time.monotonic()
+            time.sleep(config["latency"])
+            if stream:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson" if self.path == "/api/generate"
+                                 else "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for word in words:
+                    time.sleep(1.0 / config["tokens_per_sec"])
+                    self._write_chunk(self._stream_line(payload, word, done=False))
+                self._write_chunk(self._stream_line(payload, "", done=True, n_tokens=n_tokens))
+                if self.path == "/v1/chat/completions":
+                    if (payload.get("stream_options") or {}).get("include_usage"):
+                        usage = {"model": payload.get("model"), "choices": [],
+                                 "usage": {"completion_tokens": n_tokens}}
+                        self._write_chunk("data: " + json.dumps(usage) + "\n\n")
+                    self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                time.sleep(n_tokens / config["tokens_per_sec"])
+                self._send_json(200, self._full_body(payload, "".join(words).strip(), n_tokens))
+            busy = time.monotonic() - started
+
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            self.server.stats["tokens"] += n_tokens
+            self.server.stats["busy_time"] += busy
+
+    def _full_body(self, payload, text, n_tokens):
+        if self.path == "/v1/chat/completions":
+            return {"model": payload.get("model"), "usage": {"completion_tokens": n_tokens},
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}]}
+        if self.path == "/completion":
+            return {"content": text, "stop": True, "tokens_predicted": n_tokens}
+        return {"model": payload.get("model"), "response": text, "done": True, "eval_count": n_tokens}
+
+    def _stream_line(self, payload, text, done, n_tokens=None):
+        if self.path == "/v1/chat/completions":
+            chunk = {"model": payload.get("model"),
+                     "choices": [{"index": 0, "delta": {"content": text} if text else {},
+                                  "finish_reason": "stop" if done else None}]}
+            return "data: " + json.dumps(chunk) + "\n\n"
+        if self.path == "/completion":
+            body = {"content": text, "stop": done}
+            if done:
+                body["tokens_predicted"] = n_tokens
+            return "data: " + json.dumps(body) + "\n\n"
+        body = {"model": payload.get("model"), "response": text, "done": done}
+        if done:
+            body["eval_count"] = n_tokens
+        return json.dumps(body) + "\n"
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_stub_server(host="127.0.0.1", port=0, **config):
+    """Start a stub server on a background thread; port 0 picks a free port"""
+    server = StubLLMServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub LLM server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=DEFAULT_STUB_CONFIG["latency"])
+    parser.add_argument("--tokens-per-sec", type=float, default=DEFAULT_STUB_CONFIG["tokens_per_sec"])
+    parser.add_argument("--tokens", type=int, default=DEFAULT_STUB_CONFIG["tokens"])
+    parser.add_argument("--parallel", type=int, default=DEFAULT_STUB_CONFIG["parallel"])
+    args = parser.parse_args()
+
+    server = StubLLMServer((args.host, args.port), {
+        "latency": args.latency,
+        "tokens_per_sec": args.tokens_per_sec,
+        "tokens": args.tokens,
+        "parallel": args.parallel,
+    })
+    print(f"Stub LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Answer cache: versioned lookups, supersede on new data and retry of failed queries"""
+
+import threading
+import time
+
+from answer_cache import AnswerCache, normalize_query
+
+
+def wait_idle(cache, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while cache.metrics()["warming"]:
+        assert time.monotonic() < deadline, "warm-up pass did not finish"
+        time.sleep(0.005)
+
+
+def test_normalize_query():
+    assert normalize_query("  What are the TOP 5 investments?? ") == "what are the top 5 investments"
+    assert normalize_query("Growth > 10%") == normalize_query("growth 10%")
+
+
+def test_warm_then_serve_by_version():
+    cache = AnswerCache(retry_seconds=60)
+    assert cache.warm("v1", [("Top picks?", lambda: "A, B")])
+    wait_idle(cache)
+    assert cache.get("v1", "top PICKS") == "A, B"
+    assert cache.get("v2", "top picks") is None
+    assert not cache.warm("v1", [("Top picks?", lambda: "changed")])  # nothing missing
+    stats = cache.metrics()
+    assert (stats["answers"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_new_version_supersedes_running_pass():
+    cache = AnswerCache(retry_seconds=60)
+    release = threading.Event()
+    calls = []
+
+    def slow(answer):
+        def generate():
+            calls.append(answer)
+            release.wait(5)
+            return answer
+        return generate
+
+    cache.warm("v1", [("q1", slow("old 1")), ("q2", slow("old 2"))])
+    while not calls:
+        time.sleep(0.005)
+    cache.warm("v2", [("q1", lambda: "new 1"), ("q2", lambda: "new 2")])
+    release.set()
+    wait_idle(cache)
+    time.sleep(0.05)  # let the superseded v1 thread exit
+
+    assert calls == ["old 1"]  # v1 stopped after the job that was in flight
+    assert cache.version == "v2"
+    assert cache.get("v2", "q1") == "new 1" and cache.get("v2", "q2") == "new 2"
+    assert cache.get("v1", "q1") is None
+
+
+def test_failed_queries_are_retried_after_backoff():
+    cache = AnswerCache(retry_seconds=0.2)
+    attempts = {"ok": 0, "flaky": 0}
+
+    def ok():
+        attempts["ok"] += 1
+        return "fine"
+
+    def flaky():
+        attempts["flaky"] += 1
+        return None if attempts["flaky"] == 1 else "recovered"
+
+    jobs = [("ok", ok), ("flaky", flaky)]
+    assert cache.warm("v1", jobs)
+    wait_idle(cache)
+    assert cache.get("v1", "flaky") is None
+    assert cache.metrics()["failed"] == 1
+
+    assert not cache.retry_due() and not cache.warm("v1", jobs)  # inside the backoff
+    time.sleep(0.25)
+    assert cache.retry_due()
+    assert cache.warm("v1", jobs)
+    wait_idle(cache)
+
+    assert cache.get("v1", "flaky") == "recovered"
+    assert attempts == {"ok": 1, "flaky": 2}  # only the failed query was re-run
+    assert not cache.retry_due()
+
+
+def test_generator_errors_count_as_failures():
+    cache = AnswerCache(retry_seconds=60)
+
+    def broken():
+        raise RuntimeError("LLM down")
+
+    cache.warm("v1", [("q", broken)])
+    wait_idle(cache)
+    assert cache.get("v1", "q") is None
+    assert cache.metrics()["failed"] == 1
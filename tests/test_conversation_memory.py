@@ -0,0 +1,45 @@
+"""Conversation memory: follow-up expansion, focus tracking and the token budget"""
+
+from conversation_memory import ConversationMemory
+from knowledge_index import estimate_tokens
+
+INDUSTRIES = ["Manufacturing", "Government", "Information"]
+
+
+def memory_about(industry):
+    memory = ConversationMemory()
+    memory.add_exchange(f"How resilient is {industry}?", f"{industry} recovered by 2021.", INDUSTRIES)
+    return memory
+
+
+def test_follow_up_gets_industry_in_focus():
+    memory = memory_about("Manufacturing")
+    assert memory.expand_query("and how about its growth?", INDUSTRIES) == "and how about its growth? Manufacturing"
+
+
+def test_short_new_question_is_not_expanded():
+    memory = memory_about("Manufacturing")
+    assert memory.expand_query("Best long-term picks?", INDUSTRIES) == "Best long-term picks?"
+
+
+def test_question_naming_an_industry_is_not_expanded():
+    memory = memory_about("Manufacturing")
+    question = "What about Government?"
+    assert memory.expand_query(question, INDUSTRIES) == question
+
+
+def test_answer_subject_becomes_focus():
+    memory = ConversationMemory()
+    memory.add_exchange("Which sector is most resilient?", "Government held up best in 2020.", INDUSTRIES)
+    assert memory.focus_industries() == ["Government"]
+    assert memory.focus_metrics() == ["resilience"]
+
+
+def test_render_stays_within_budget():
+    memory = ConversationMemory(recent_turns=2, summary_tokens=60)
+    for i in range(20):
+        memory.add_exchange(f"Question {i} about Information growth " + "detail " * 30,
+                            "Answer " + "words " * 80, INDUSTRIES)
+    text = memory.render(token_budget=150)
+    assert estimate_tokens(text) <= 150
+    assert "Information" in text
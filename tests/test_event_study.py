@@ -0,0 +1,81 @@
+"""Event study: shock windows, recovery and scoring on a small fixture panel"""
+
+import numpy as np
+import pytest
+
+from event_study import SHOCK_SCORE_MAX, candidate_windows, compute_event_study, parse_windows
+from question_patterns import shock_windows
+
+YEARS = [2018, 2019, 2020, 2021, 2022]
+INDUSTRIES = ["Dip and recover", "Grower", "Slump"]
+VALUES = np.array([
+    [100.0, 100.0, 80.0, 100.0, 110.0],   # -20% in 2020, back at baseline in 2021
+    [100.0, 100.0, 110.0, 120.0, 130.0],  # never below baseline
+    [100.0, 100.0, 70.0, 60.0, 90.0],     # worse in 2021, not yet recovered
+])
+
+
+@pytest.fixture
+def study():
+    windows = candidate_windows(YEARS, extra_windows=[(2020, 2021)])
+    return compute_event_study("v1", INDUSTRIES, YEARS, VALUES, windows)
+
+
+def test_candidate_windows():
+    assert candidate_windows(YEARS, [(2020, 2021), (2018, 2019)]) == [
+        (2019, 2019), (2020, 2020), (2021, 2021), (2022, 2022), (2020, 2021)
+    ]
+
+
+def test_single_year_window_matches_drop2020(study):
+    j = study.window_index((2020, 2020))
+    np.testing.assert_allclose(study.drop[:, j], [-0.2, 0.1, -0.3])
+    np.testing.assert_allclose(study.trough[:, j], [-0.2, 0.1, -0.4])
+    assert list(study.trough_year[:, j]) == [2020, 2020, 2021]
+    assert list(study.recovery[:, j]) == [1, 0, np.inf]
+
+
+def test_multi_year_window_takes_worst_level(study):
+    j = study.window_index((2020, 2021))
+    np.testing.assert_allclose(study.drop[:, j], [-0.2, 0.1, -0.4])
+
+
+def test_score_ranks_smallest_fall_first(study):
+    j = study.window_index((2020, 2020))
+    # Same rule as ShockResilience01 = rescale01(Drop2020, max_score = 83) in the R script
+    drop = study.drop[:, j]
+    expected = SHOCK_SCORE_MAX * (drop - drop.min()) / (drop.max() - drop.min())
+    np.testing.assert_allclose(study.score[:, j], expected)
+    assert [r["industry"] for r in study.top((2020, 2020))] == ["Grower", "Dip and recover", "Slump"]
+    assert study.top((2020, 2020), n=1, most_resilient=False)[0]["industry"] == "Slump"
+
+
+def test_relative_to_peer_median(study):
+    row = study.top((2020, 2020), n=1)[0]
+    assert row["relative_to_peers"] == pytest.approx(0.1 - (-0.2))
+
+
+def test_parse_windows():
+    assert parse_windows("most resilient to 2013 and 2020-2021 or 2022 to 2020?") == [
+        (2013, 2013), (2020, 2021), (2020, 2022)
+    ]
+
+
+@pytest.mark.parametrize("question, windows", [
+    ("Which sectors were most resilient to the 2013 shock?", [(2013, 2013)]),
+    ("Who recovered fastest from 2020?", [(2020, 2020)]),
+    ("Which industries weathered the 2008 recession?", [(2008, 2008)]),
+    ("COVID impact 2020-2021", [(2020, 2021)]),
+])
+def test_shock_questions_are_routed(question, windows):
+    assert shock_windows(question) == windows
+
+
+@pytest.mark.parametrize("question", [
+    "How did growth recover in 2021?",
+    "What is the recovery outlook for 2030?",
+    "What was growth in 2020?",
+    "Which sectors are most resilient?",
+])
+def test_other_questions_are_not_shock_questions(question):
+    assert shock_windows(question) == []
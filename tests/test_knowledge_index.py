@@ -0,0 +1,64 @@
+"""Knowledge index: growth tagging, CAGR labels and BM25 retrieval"""
+
+import csv
+
+from knowledge_index import GROWTH_TAGS, KnowledgeIndex, build_industry_documents
+
+FIELDS = ['Industry', 'Overall01', 'Growth01', 'CAGR', 'FirstYear', 'LastYear']
+
+
+def write_metrics(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(zip(FIELDS, row)))
+    return str(path)
+
+
+def by_name(docs):
+    return {doc.industry: doc for doc in docs}
+
+
+def test_growth_tags_follow_cagr_not_overall_rank(tmp_path):
+    # Sorted by overall score (as the R script writes it); growth order is reversed
+    rows = [(f"Industry {c}", 1 - i / 10, i / 10, 0.01 * i, 2012, 2023)
+            for i, c in enumerate("ABCDEFG")]
+    metrics = write_metrics(tmp_path / "metrics.csv", rows)
+    results = {'top_investments': [{'industry': f"Industry {c}"} for c in "ABCDE"]}
+
+    docs = by_name(build_industry_documents(results, metrics, regression_files={}))
+
+    tagged = {name for name, doc in docs.items() if GROWTH_TAGS in doc.tags}
+    assert tagged == {f"Industry {c}" for c in "CDEFG"}
+
+
+def test_cagr_label_uses_panel_years(tmp_path):
+    metrics = write_metrics(tmp_path / "metrics.csv", [("Satellites", 0.9, 0.8, 0.05, 2012, 2024)])
+    doc = build_industry_documents({}, metrics, regression_files={})[0]
+    assert "CAGR 2012-2024 5.0%" in doc.text()
+
+
+def test_cagr_label_without_years(tmp_path):
+    metrics = write_metrics(tmp_path / "metrics.csv", [("Satellites", 0.9, 0.8, 0.05, "", "")])
+    doc = build_industry_documents({}, metrics, regression_files={})[0]
+    assert "CAGR 5.0%" in doc.text()
+
+
+def test_growth_fallback_without_metrics_table(tmp_path):
+    # Shortlist ranked by overall score; the top pick has the weakest growth
+    results = {'top_investments': [
+        {'industry': f"Pick {c}", 'overall_score': '0.9', 'growth': f"0.{i}"} for i, c in enumerate("ABCDEF")
+    ]}
+    docs = by_name(build_industry_documents(results, str(tmp_path / "missing.csv"), regression_files={}))
+    assert GROWTH_TAGS not in docs["Pick A"].tags
+    assert GROWTH_TAGS in docs["Pick F"].tags
+
+
+def test_search_prefers_tagged_industry(tmp_path):
+    rows = [("Launch services", 0.5, 0.9, 0.12, 2012, 2023),
+            ("Ground equipment", 0.9, 0.1, -0.02, 2012, 2023)]
+    metrics = write_metrics(tmp_path / "metrics.csv", rows)
+    index = KnowledgeIndex(build_industry_documents({}, metrics, regression_files={}))
+    score, doc = index.search("which sectors are growing fastest?", k=1)[0]
+    assert doc.industry == "Launch services"
@@ -0,0 +1,91 @@
+"""LLM backends against the stub server: streaming, token limits and benchmark token counts"""
+
+import pytest
+
+from llm_backends import BACKENDS, LLMBackendError, benchmark_backend, make_backend
+from llm_scheduler import LLMScheduler
+from stub_llm_server import start_stub_server
+
+PATHS = {"ollama": "/api/generate", "openai": "/v1/chat/completions", "llamacpp": "/completion"}
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = start_stub_server(latency=0.0, tokens_per_sec=2000, tokens=12)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def backend_for(server, api_type, **config):
+    host, port = server.server_address[:2]
+    return make_backend({"api_type": api_type, "url": f"http://{host}:{port}{PATHS[api_type]}",
+                         "model": "stub", **config})
+
+
+@pytest.mark.parametrize("api_type", sorted(BACKENDS))
+def test_stream_reports_server_token_count(server, api_type):
+    backend = backend_for(server, api_type, max_tokens=5)
+    usage = {}
+    chunks = list(backend.stream("hello", usage=usage))
+    assert len(chunks) == 5
+    assert usage == {"completion_tokens": 5}
+
+
+@pytest.mark.parametrize("api_type", sorted(BACKENDS))
+def test_on_token_sees_every_chunk(server, api_type):
+    backend = backend_for(server, api_type)
+    seen = []
+    text = backend.generate("hello", "be brief", on_token=seen.append)
+    assert seen and "".join(seen) == text
+    assert backend.generate("hello", "be brief") == text.strip()
+
+
+def test_benchmark_counts_server_tokens(server):
+    backend = backend_for(server, "ollama", max_tokens=8)
+    stats = benchmark_backend(backend, runs=2)
+    assert stats["tokens"] == 8
+    assert stats["token_count"] == "server"
+
+
+def test_benchmark_falls_back_to_chunks():
+    class Silent(BACKENDS["ollama"]):
+        def stream(self, prompt, system_prompt="", usage=None):
+            yield from ("a", "b", "c")
+
+    stats = benchmark_backend(Silent({"url": "http://localhost:1/api/generate", "model": "x"}), runs=1)
+    assert stats["tokens"] == 3
+    assert stats["token_count"] == "chunks"
+
+
+@pytest.mark.parametrize("api_type, line", [
+    ("ollama", '{"error": "model \'llama3.2:3b\' not found"}'),
+    ("openai", 'data: {"error": {"message": "model not loaded"}}'),
+    ("llamacpp", 'data: {"error": {"code": 500, "message": "context overflow"}}'),
+])
+def test_error_lines_raise(server, api_type, line):
+    backend = backend_for(server, api_type)
+    with pytest.raises(LLMBackendError):
+        backend.parse_stream_line(line)
+    with pytest.raises(LLMBackendError):
+        backend.parse_response({"error": "boom"})
+
+
+def test_interrupted_stream_frees_the_slot(server):
+    class Rerun(BaseException):
+        """Stands in for Streamlit's RerunException raised while a token is drawn"""
+
+    def on_token(chunk):
+        raise Rerun()
+
+    backend = backend_for(server, "ollama")
+    scheduler = LLMScheduler(max_in_flight=1, queue_timeout=0.5)
+    with pytest.raises(Rerun):
+        scheduler.run(lambda: backend.generate("hello", on_token=on_token))
+    assert scheduler.metrics()["in_flight"] == 0
+    assert scheduler.run(lambda: backend.generate("hello"))  # slot and connection pool still usable
+
+
+def test_unknown_api_type():
+    with pytest.raises(ValueError, match="Unknown api_type"):
+        make_backend({"api_type": "nope", "url": "http://localhost", "model": "x"})
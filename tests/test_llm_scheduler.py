@@ -0,0 +1,117 @@
+"""Tests for llm_scheduler: priorities, round-robin across sessions, rejection"""
+
+import threading
+import time
+
+import pytest
+
+from llm_scheduler import (
+    LLMScheduler, SchedulerRejected, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for scheduler state"
+        time.sleep(0.005)
+
+
+def hold_slot(scheduler):
+    """Occupy the only slot until the returned event is set"""
+    release = threading.Event()
+    thread = threading.Thread(target=scheduler.run, args=(release.wait,), kwargs={"session_id": "holder"})
+    thread.start()
+    wait_for(lambda: scheduler.metrics()["in_flight"] == 1)
+    return release, thread
+
+
+def queue_in_order(scheduler, requests):
+    """Enqueue (session_id, priority, label) one at a time; returns (threads, served order)"""
+    served = []
+    threads = []
+    for session_id, priority, label in requests:
+        depth = scheduler.metrics()["queue_depth"]
+        thread = threading.Thread(
+            target=scheduler.run,
+            args=(lambda label=label: served.append(label),),
+            kwargs={"session_id": session_id, "priority": priority},
+        )
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: scheduler.metrics()["queue_depth"] == depth + 1)
+    return threads, served
+
+
+def test_higher_priority_served_first():
+    scheduler = LLMScheduler(max_in_flight=1, queue_timeout=5)
+    release, holder = hold_slot(scheduler)
+    threads, served = queue_in_order(scheduler, [
+        ("warmup", PRIORITY_BATCH, "batch"),
+        ("alice", PRIORITY_INTERACTIVE, "interactive"),
+    ])
+    release.set()
+    for thread in [holder] + threads:
+        thread.join(2)
+    assert served == ["interactive", "batch"]
+
+
+def test_sessions_served_round_robin():
+    scheduler = LLMScheduler(max_in_flight=1, queue_timeout=5)
+    release, holder = hold_slot(scheduler)
+    threads, served = queue_in_order(scheduler, [
+        ("alice", PRIORITY_INTERACTIVE, "a1"),
+        ("alice", PRIORITY_INTERACTIVE, "a2"),
+        ("bob", PRIORITY_INTERACTIVE, "b1"),
+    ])
+    release.set()
+    for thread in [holder] + threads:
+        thread.join(2)
+    assert served == ["a1", "b1", "a2"]
+
+
+def test_full_queue_rejects():
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=0, queue_timeout=5)
+    release, holder = hold_slot(scheduler)
+    with pytest.raises(SchedulerRejected):
+        scheduler.run(lambda: None, session_id="alice")
+    release.set()
+    holder.join(2)
+    assert scheduler.metrics()["rejected"] == 1
+
+
+def test_zero_timeout_does_not_wait():
+    scheduler = LLMScheduler(max_in_flight=1, queue_timeout=0)
+    release, holder = hold_slot(scheduler)
+    started = time.monotonic()
+    with pytest.raises(SchedulerRejected):
+        scheduler.run(lambda: None, session_id="alice")
+    assert time.monotonic() - started < 1.0
+    release.set()
+    holder.join(2)
+    metrics = scheduler.metrics()
+    assert metrics["timed_out"] == 1 and metrics["queue_depth"] == 0
+
+
+def test_long_prompts_are_demoted():
+    scheduler = LLMScheduler(short_prompt_chars=10)
+    assert scheduler.classify("short", PRIORITY_INTERACTIVE) == PRIORITY_INTERACTIVE
+    assert scheduler.classify("x" * 50, PRIORITY_INTERACTIVE) != PRIORITY_INTERACTIVE
+    assert scheduler.classify("x" * 50, PRIORITY_BATCH) == PRIORITY_BATCH
+
+
+def test_interrupted_call_releases_slot():
+    class Interrupted(BaseException):
+        """Stands in for Streamlit's RerunException / StopException"""
+
+    scheduler = LLMScheduler(max_in_flight=1, queue_timeout=0.5)
+
+    def interrupted():
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        scheduler.run(interrupted)
+    stats = scheduler.metrics()
+    assert stats["in_flight"] == 0
+    assert stats["failed"] == 1
+    assert scheduler.run(lambda: "next") == "next"
@@ -0,0 +1,86 @@
+"""Panel store: appends, revisions, withdrawals and incremental metrics"""
+
+import pytest
+
+from panel_store import PanelStore, SeriesState
+
+TABLE = 'Table 1'
+BASE = {2019: 100.0, 2020: 90.0, 2021: 110.0}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PanelStore(str(tmp_path / "panel.db"))
+    store.append(TABLE, '2024-01-01', [('Launch', year, value) for year, value in BASE.items()])
+    yield store
+    store.close()
+
+
+def test_new_year_is_an_append(store):
+    summary = store.append_year(TABLE, 2022, {'Launch': 121.0}, '2025-01-01')
+
+    assert summary == {'appended': 1, 'revised': 0, 'unchanged': 0, 'rebuilt_series': 0}
+    assert store.panel(TABLE)['Launch'] == {**BASE, 2022: 121.0}
+    expected = SeriesState.from_values({**BASE, 2022: 121.0}).metrics()
+    assert store.metrics(TABLE)['Launch'] == pytest.approx(expected)
+
+
+def test_revision_rebuilds_series_and_keeps_history(store):
+    summary = store.append(TABLE, '2025-01-01', [('Launch', 2020, 95.0), ('Launch', 2021, 110.0)])
+
+    assert summary == {'appended': 0, 'revised': 1, 'unchanged': 1, 'rebuilt_series': 1}
+    assert store.panel(TABLE)['Launch'][2020] == 95.0
+    assert store.panel(TABLE, as_of='2024-01-01')['Launch'][2020] == 90.0
+    expected = SeriesState.from_values({**BASE, 2020: 95.0}).metrics()
+    assert store.metrics(TABLE)['Launch'] == pytest.approx(expected)
+    assert store.metrics(TABLE, as_of='2024-01-01')['Launch'] == pytest.approx(SeriesState.from_values(BASE).metrics())
+
+
+def test_unchanged_release_writes_nothing(store):
+    version = store.version()
+    cells = [('Launch', year, value) for year, value in BASE.items()]
+
+    summary = store.append(TABLE, '2025-01-01', cells, complete=True)
+
+    assert summary == {'appended': 0, 'revised': 0, 'unchanged': 3, 'rebuilt_series': 0}
+    assert store.version() == version
+    assert store.vintages() == ['2024-01-01']
+
+
+def test_complete_release_withdraws_missing_cells(store):
+    summary = store.append(TABLE, '2025-01-01', [('Launch', 2019, 100.0), ('Launch', 2020, 90.0)],
+                           complete=True)
+
+    assert summary['revised'] == 1
+    assert store.panel(TABLE)['Launch'] == {2019: 100.0, 2020: 90.0}
+    assert store.metrics(TABLE)['Launch']['last_year'] == 2020
+
+
+def test_conflicting_value_in_same_vintage_is_rejected(store):
+    with pytest.raises(ValueError, match="new vintage"):
+        store.append(TABLE, '2024-01-01', [('Launch', 2020, 80.0)])
+
+
+def test_older_vintage_is_rejected(store):
+    with pytest.raises(ValueError, match="older"):
+        store.append(TABLE, '2023-01-01', [('Launch', 2022, 1.0)])
+
+
+def test_append_reads_only_the_written_cells(store):
+    store.append(TABLE, '2024-01-01', [('Ground', 2019, 50.0), ('Ground', 2020, 40.0)])
+
+    assert store._stored_cells(TABLE, '2024-01-01', [('Launch', 2020), ('Launch', 2030)]) == {
+        ('Launch', 2020): (90.0, '2024-01-01')}
+    summary = store.append(TABLE, '2025-01-01', [('Ground', 2019, 55.0)])
+    assert summary == {'appended': 0, 'revised': 1, 'unchanged': 0, 'rebuilt_series': 1}
+    assert store.metrics(TABLE)['Launch'] == pytest.approx(SeriesState.from_values(BASE).metrics())
+    assert store.panel(TABLE)['Ground'] == {2019: 55.0, 2020: 40.0}
+
+
+def test_version_changes_with_every_append(store):
+    before = store.version()
+    store.append_year(TABLE, 2022, {'Launch': 121.0}, '2024-01-01')
+    after = store.version()
+    assert after != before
+    store.append_year(TABLE, 2022, {'Launch': 121.0}, '2024-01-01')  # unchanged: nothing written
+    assert store.version() == after
@@ -0,0 +1,100 @@
+"""Portfolio optimizer: projections, shrinkage and constrained allocations"""
+
+import numpy as np
+import pytest
+
+from portfolio import ReturnModel, efficient_frontier, ledoit_wolf_constant_correlation, optimize, project, \
+    project_capped_simplex
+from question_patterns import parse_portfolio_request
+
+TOL = 1e-9
+
+
+def bisection_projection(y, upper, total):
+    """Reference: find tau with sum(clip(y - tau, 0, upper)) = total by bisection"""
+    lo, hi = y.min() - upper - 1, y.max() + 1
+    for _ in range(200):
+        tau = (lo + hi) / 2
+        if np.clip(y - tau, 0, upper).sum() > total:
+            lo = tau
+        else:
+            hi = tau
+    return np.clip(y - (lo + hi) / 2, 0, upper)
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(7)
+    n, t = 10, 12
+    factor = rng.normal(0.0, 0.03, t)
+    returns = 0.02 + np.linspace(-0.01, 0.03, n)[:, None] + np.outer(np.linspace(0.5, 2, n), factor) \
+        + rng.normal(0.0, 0.02, (n, t))
+    resilient = np.arange(n) < 3
+    return ReturnModel("v1", [f"Industry {c}" for c in "ABCDEFGHIJ"], list(range(2010, 2010 + t + 1)),
+                       returns, resilient)
+
+
+@pytest.mark.parametrize("upper, total", [(0.25, 1.0), (0.5, 1.0), (1.0, 1.0), (0.2, 0.6)])
+def test_capped_simplex_is_feasible_and_exact(upper, total):
+    rng = np.random.default_rng(0)
+    y = rng.normal(0.0, 1.0, (50, 8))
+    w = project_capped_simplex(y, upper, np.full(len(y), total))
+    assert (w >= -TOL).all() and (w <= upper + TOL).all()
+    np.testing.assert_allclose(w.sum(axis=1), total, atol=1e-9)
+    for row, expected in zip(w, (bisection_projection(r, upper, total) for r in y)):
+        np.testing.assert_allclose(row, expected, atol=1e-7)
+
+
+def test_capped_simplex_keeps_feasible_points():
+    y = np.array([[0.25, 0.25, 0.2, 0.2, 0.1]])
+    np.testing.assert_allclose(project_capped_simplex(y, 0.25, np.ones(1)), y)
+
+
+def test_project_enforces_resilient_share():
+    rng = np.random.default_rng(1)
+    resilient = np.array([True, True, True, False, False, False, False, False])
+    y = rng.normal(0.0, 1.0, (40, 8))
+    y[:, ~resilient] += 2.0  # pull weight away from the resilient group
+    w = project(y, resilient, 0.3, 0.4)
+    assert (w >= -TOL).all() and (w <= 0.3 + TOL).all()
+    np.testing.assert_allclose(w.sum(axis=1), 1.0, atol=1e-9)
+    assert (w[:, resilient].sum(axis=1) >= 0.4 - 1e-9).all()
+
+
+def test_shrinkage_covariance_is_valid(model):
+    cov, shrinkage = ledoit_wolf_constant_correlation(model.returns.T)
+    assert 0.0 <= shrinkage <= 1.0
+    np.testing.assert_allclose(cov, cov.T)
+    assert np.linalg.eigvalsh(cov).min() > 0
+    np.testing.assert_allclose(np.diag(cov), model.returns.var(axis=1))
+
+
+@pytest.mark.parametrize("strategy", ["min_variance", "mean_variance", "max_diversification"])
+def test_allocations_meet_constraints(model, strategy):
+    result = optimize(model, strategy, max_weight=0.3, resilient_share=0.35)
+    weights = np.array([w for _, w in result["weights"]])
+    assert weights.max() <= 0.3 + 1e-6
+    assert weights.sum() == pytest.approx(1.0, abs=1e-3)
+    assert result["resilient_share"] >= 0.35 - 1e-6
+
+
+def test_min_variance_has_lowest_volatility(model):
+    low = optimize(model, "min_variance", max_weight=0.3, resilient_share=0.3)
+    frontier = efficient_frontier(model, max_weight=0.3, resilient_share=0.3)
+    assert all(point["volatility"] >= low["volatility"] - 1e-6 for point in frontier)
+    returns = np.array([point["expected_return"] for point in frontier])
+    assert (np.diff(returns) <= 1e-9).all()  # riskiest (highest return) first
+
+
+def test_infeasible_constraints_are_rejected(model):
+    with pytest.raises(ValueError, match="cannot fully invest"):
+        optimize(model, "min_variance", max_weight=0.05)
+    with pytest.raises(ValueError, match="resilient share"):
+        optimize(model, "min_variance", max_weight=0.2, resilient_share=0.8)
+
+
+def test_parse_portfolio_request():
+    request = parse_portfolio_request("Build a min variance portfolio, max 20% each, at least 40% resilient")
+    assert request == {"strategies": ("min_variance",), "frontier": False,
+                       "max_weight": 0.2, "resilient_share": 0.4}
+    assert parse_portfolio_request("Which sector grew fastest?") is None
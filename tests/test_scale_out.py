@@ -0,0 +1,60 @@
+"""Scale-out analysis: per-series metrics and block-invariant rankings on a synthetic panel"""
+
+import numpy as np
+import pytest
+
+from scale_out import METRICS, compute_block_metrics, generate_panel, run_panel
+
+YEARS = list(range(2016, 2024))
+
+
+def metric(out, name):
+    return out[:, METRICS.index(name)]
+
+
+def test_block_metrics_follow_r_definitions():
+    values = np.array([
+        [100, 110, 121, 133.1, 120, 133.1, 146.41, 161.051],  # 2020 dip, back at 2019 level in 2021
+        [100, 100, 100, 100, 100, 100, 100, 100],            # flat
+    ], dtype=float)
+    out = compute_block_metrics(values, None, YEARS, shock_year=2020, train_end=2018)
+
+    np.testing.assert_allclose(metric(out, "cagr"), [1.61051 ** (1 / 7) - 1, 0.0])
+    np.testing.assert_allclose(metric(out, "shock_drop"), [120 / 133.1 - 1, 0.0])
+    np.testing.assert_allclose(metric(out, "max_dd"), [120 / 133.1 - 1, 0.0])
+    np.testing.assert_allclose(metric(out, "recovery"), [1.0, 0.0])
+    assert np.isnan(metric(out, "prod_slope")).all()  # no employment panel
+    assert 0.0 < metric(out, "mape")[0] < 0.2
+
+
+def test_missing_and_late_series():
+    values = np.array([[np.nan, np.nan, 50, 55, 40, 45, 50, 60]], dtype=float)
+    out = compute_block_metrics(values, None, YEARS, shock_year=2020, train_end=2018)
+    assert np.isnan(metric(out, "cagr"))[0]  # no first-year value, as cagr_fun
+    assert metric(out, "recovery")[0] == 3.0
+    assert metric(out, "shock_drop")[0] == pytest.approx(40 / 55 - 1)
+
+
+@pytest.fixture(scope="module")
+def panel(tmp_path_factory):
+    return generate_panel(str(tmp_path_factory.mktemp("panel")), 600, years=range(2012, 2024),
+                          seed=3, block_size=200)
+
+
+def test_rankings_do_not_depend_on_blocking(panel):
+    one = run_panel(panel, workers=0, block_size=600, top_n=5)
+    many = run_panel(panel, workers=0, block_size=150, top_n=5)
+    assert one["blocks"] == 1 and many["blocks"] == 4
+    for name in ("shock", "predictable", "growth", "overall"):
+        assert [r["index"] for r in many["rankings"][name]] == [r["index"] for r in one["rankings"][name]]
+
+
+def test_worker_pool_matches_inline(panel):
+    inline = run_panel(panel, workers=0, block_size=200, top_n=5)
+    pooled = run_panel(panel, workers=2, block_size=200, top_n=5)
+    assert pooled["rankings"] == inline["rankings"]
+
+
+def test_shock_ranking_puts_smallest_fall_first(panel):
+    drops = [r["shock_drop"] for r in run_panel(panel, workers=0, block_size=300, top_n=5)["rankings"]["shock"]]
+    assert drops == sorted(drops, reverse=True)
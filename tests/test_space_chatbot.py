@@ -0,0 +1,47 @@
+"""Chatbot answer path: LLM failures are told apart from answers by type, not by their text"""
+
+import pytest
+import requests
+
+from llm_backends import LLMBackendError
+from space_chatbot import LLMFailure, SpaceEconomyBot
+
+QUESTION = "How reliable are the sector forecasts?"
+
+
+class FakeBackend:
+    api_type = "fake"
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    def generate(self, prompt, system_prompt="", on_token=None):
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply
+
+
+def bot_with(reply):
+    bot = SpaceEconomyBot()
+    bot.backend = FakeBackend(reply)
+    return bot
+
+
+def test_answer_mentioning_error_is_kept():
+    answer = "Forecast Error is below 5% for most sectors, so the outlook is reliable."
+    response = bot_with(answer).generate_response(QUESTION, fallback=False, use_cache=False)
+    assert response == answer
+    assert not isinstance(response, LLMFailure)
+
+
+@pytest.mark.parametrize("reply", [
+    LLMBackendError("model not found"),
+    requests.exceptions.ConnectionError("refused"),
+    "",
+])
+def test_llm_failures_are_typed(reply):
+    bot = bot_with(reply)
+    assert isinstance(bot.query_local_llm(QUESTION), LLMFailure)
+    assert bot.generate_response(QUESTION, fallback=False, use_cache=False) is None
+    fallback = bot.generate_response(QUESTION, use_cache=False)
+    assert fallback and not isinstance(fallback, LLMFailure)